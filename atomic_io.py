@@ -0,0 +1,31 @@
+"""
+Atomic file writes shared by the crawlers' result, cache, index and report files.
+
+- The content is written to a temp file next to the target, flushed and fsynced, then renamed over it
+  with os.replace, so readers (and a crash) never see a partially written file.
+- The temp file name includes the process id, so concurrent processes do not clobber each other's temp file.
+"""
+
+import json
+import os
+
+
+def write_text_atomic(text, path, mode=0o666):
+    """
+    Write text to path via a temp file and rename. mode sets the permissions of a newly created file
+    (before the umask), e.g. 0o600 for files only the owner may read.
+    """
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+    with os.fdopen(fd, 'w', encoding='utf-8') as out:
+        out.write(text)
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(tmp_path, path)
+
+
+def write_json_atomic(data, path, indent=2, mode=0o666):
+    """
+    Write data as JSON to path via a temp file and rename, so readers never see a partial file.
+    """
+    write_text_atomic(json.dumps(data, ensure_ascii=False, indent=indent), path, mode)
@@ -0,0 +1,133 @@
+"""
+Author registry for 1:1 conversations.
+
+- Each distinct avatar URL gets a compact author id derived from the URL itself, so every worker,
+  process and run assigns the same id without coordination. The author name is recorded too when the
+  avatar <img> carries one (alt text).
+- Conversations reference their author by 'author_id' instead of repeating the full 'avatar_url';
+  the registry ({author_id: {'avatar_url', 'name'}}) is saved once through the result store
+  (authors.json next to the session files, or the authors table of the SQLite database).
+- Conversations without an avatar get author_id null.
+- inline_conversations() turns compact conversations back into the original inline form, which the
+  crawlers still emit with --inline-avatars.
+- prepare_meetings() is applied to a session's meetings right before they are saved, so journals,
+  stored sessions from older runs and freshly extracted meetings all end up in the same form.
+"""
+
+import hashlib
+import threading
+import weakref
+
+
+def author_id(avatar_url):
+    """Compact, stable id of the author behind avatar_url (None when there is no avatar)."""
+    if not avatar_url:
+        return None
+    return 'a' + hashlib.sha1(avatar_url.encode('utf-8')).hexdigest()[:10]
+
+
+def compact_conversations(conversations):
+    """
+    Replace avatar_url (and author_name) with author_id in each conversation.
+    Returns (compact conversations, {author_id: {'avatar_url', 'name'}} of the authors seen).
+    Conversations that are already compact are passed through.
+    """
+    compacted = []
+    authors = {}
+    for conversation in conversations:
+        if 'avatar_url' not in conversation:
+            compacted.append(conversation)
+            continue
+        avatar_url = conversation['avatar_url']
+        author = author_id(avatar_url)
+        if author is not None:
+            name = conversation.get('author_name')
+            if author not in authors or (name and not authors[author]['name']):
+                authors[author] = {'avatar_url': avatar_url, 'name': name}
+        compacted.append({
+            'block_index': conversation['block_index'],
+            'child_index': conversation['child_index'],
+            'text': conversation['text'],
+            'author_id': author,
+        })
+    return compacted, authors
+
+
+def inline_conversations(conversations, authors=None):
+    """
+    The original inline form ({'block_index', 'child_index', 'text', 'avatar_url'}) of conversations,
+    resolving author ids through authors. Extra fields such as author_name are dropped.
+    """
+    inlined = []
+    for conversation in conversations:
+        if 'avatar_url' in conversation:
+            avatar_url = conversation['avatar_url']
+        else:
+            author = (authors or {}).get(conversation['author_id']) if conversation['author_id'] else None
+            avatar_url = author['avatar_url'] if author else ''
+        inlined.append({
+            'block_index': conversation['block_index'],
+            'child_index': conversation['child_index'],
+            'text': conversation['text'],
+            'avatar_url': avatar_url,
+        })
+    return inlined
+
+
+class AuthorRegistry:
+    """
+    The authors known to a result store, shared by every worker thread writing to it.
+    """
+
+    def __init__(self, store):
+        # A weak reference, so the store (and with it this registry) can be dropped by close_stores()
+        self.store = weakref.proxy(store)
+        self.authors = store.load_authors()
+        self._lock = threading.Lock()
+
+    def merge(self, authors):
+        """Add new authors (or names for known ones) and save the registry if anything changed."""
+        with self._lock:
+            changed = False
+            for author, info in authors.items():
+                known = self.authors.get(author)
+                if known is None or (info['name'] and not known.get('name')):
+                    self.authors[author] = info
+                    changed = True
+            if changed:
+                self.store.save_authors(dict(self.authors))
+
+    def compact(self, conversations):
+        """Compact conversations and register their authors. Returns the compact conversations."""
+        compacted, authors = compact_conversations(conversations)
+        if authors:
+            self.merge(authors)
+        return compacted
+
+
+# Keyed on the store object itself, so a registry goes away with its (closed) store
+_registries = weakref.WeakKeyDictionary()
+_registries_lock = threading.Lock()
+
+
+def registry_for(store):
+    """The AuthorRegistry of a result store, created on first use."""
+    with _registries_lock:
+        registry = _registries.get(store)
+        if registry is None:
+            registry = _registries[store] = AuthorRegistry(store)
+        return registry
+
+
+def prepare_meetings(meetings, store, inline_avatars=False):
+    """
+    Meetings ready to save to store: conversations compacted against the store's author registry,
+    or in the original inline form if inline_avatars is set.
+    """
+    registry = registry_for(store)
+    if inline_avatars:
+        convert = lambda conversations: inline_conversations(conversations, registry.authors)
+    else:
+        convert = registry.compact
+    return [{'meeting_date': meeting['meeting_date'], 'conversations': convert(meeting['conversations'])}
+            for meeting in meetings]
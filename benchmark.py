@@ -0,0 +1,196 @@
+"""
+Offline crawler benchmark against the local mock Lemonbase server (mock_lemonbase.py).
+
+- Generates synthetic reviews and 1:1 sessions and serves them locally, with configurable latency
+  and client-side redirects.
+- Points both crawlers at the server (LEMONBASE_BASE_URL) with throwaway credentials and session cache,
+  and runs discovery plus extraction end to end in a scratch directory with run metrics on.
+- Reports pages/sec and per-URL latency (p50/p95/p99) for each crawler.
+- Compares every output file with the generated ground truth and exits non-zero on any mismatch,
+  so regressions are caught in CI without network access. Chrome and ChromeDriver are still required.
+
+Usage:
+    python benchmark.py [--crawler both|review|one-on-one] [--reviews 40] [--sessions 10] [--meetings 4]
+                        [--conversations 5] [--latency 0.02] [--client-redirects] [--workers 2]
+                        [--json benchmark.json]
+"""
+
+import importlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from mock_lemonbase import MockData, start_mock_server
+
+
+def _configure_environment(base_url, workdir):
+    """
+    Must run before the crawlers (and session_cache) are imported: they read these at import time.
+    """
+    os.environ['LEMONBASE_BASE_URL'] = base_url
+    os.environ['LEMONBASE_EMAIL'] = 'benchmark@lemonbase.test'
+    os.environ['LEMONBASE_PASSWORD'] = 'benchmark'
+    os.environ['LEMONBASE_SESSION_CACHE'] = os.path.join(workdir, 'session_cache.json')
+
+
+def check_reviews(data, output_dir):
+    """
+    Compare shared-review-<id>.txt files with the ground truth. Returns a list of mismatch descriptions.
+    """
+    mismatches = []
+    for review_id in data.reviews:
+        expected = data.expected_review(review_id)
+        path = os.path.join(output_dir, f'shared-review-{review_id}.txt')
+        if expected is None:
+            if os.path.exists(path):
+                mismatches.append(f'{review_id}: write-review page was saved')
+            continue
+        if not os.path.exists(path):
+            mismatches.append(f'{review_id}: missing output')
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() != expected:
+                mismatches.append(f'{review_id}: content differs')
+    return mismatches
+
+
+def check_sessions(data, output_dir):
+    """
+    Compare session_<id>.json files and authors.json with the ground truth. Returns a list of mismatch descriptions.
+    """
+    mismatches = []
+    for session_id in data.sessions:
+        path = os.path.join(output_dir, f'session_{session_id}.json')
+        if not os.path.exists(path):
+            mismatches.append(f'{session_id}: missing output')
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            if json.load(f) != data.expected_session(session_id):
+                mismatches.append(f'{session_id}: content differs')
+    path = os.path.join(output_dir, 'authors.json')
+    if not os.path.exists(path):
+        mismatches.append('authors.json: missing output')
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            if json.load(f) != data.expected_authors():
+                mismatches.append('authors.json: content differs')
+    return mismatches
+
+
+def _run_crawler(name, rundir, run, check):
+    """
+    Run one crawler in rundir and collect timing, run metrics and ground-truth mismatches.
+    """
+    from run_metrics import metrics
+    os.makedirs(rundir, exist_ok=True)
+    cwd = os.getcwd()
+    os.chdir(rundir)
+    result = {'crawler': name, 'error': None}
+    started = time.monotonic()
+    try:
+        run()
+    except Exception as e:
+        result['error'] = f'{e.__class__.__name__}: {str(e).strip()}'
+    finally:
+        result['elapsed_seconds'] = time.monotonic() - started
+        summary = metrics.summary()
+        os.chdir(cwd)
+    result['urls'] = summary['counters'].get('urls', 0)
+    result['pages_per_second'] = result['urls'] / result['elapsed_seconds'] if result['elapsed_seconds'] else 0.0
+    result['url_latency'] = summary['phases'].get('url', {})
+    result['metrics'] = summary
+    result['mismatches'] = check(rundir)
+    return result
+
+
+def run_benchmark(data, workdir, crawlers=('review', 'one-on-one'), workers=2, tabs=1, server_options=None):
+    """
+    Serve data from a mock server and run the selected crawlers against it. Returns one result dict per crawler.
+    """
+    server = start_mock_server(data, **(server_options or {}))
+    _configure_environment(server.base_url, workdir)
+    results = []
+    try:
+        if 'review' in crawlers:
+            review_crawler = importlib.import_module('review_crawler')
+            rundir = os.path.join(workdir, 'review')
+            results.append(_run_crawler(
+                'review', rundir,
+                lambda: review_crawler.main(workers=workers, metrics_path='metrics.json'),
+                lambda rundir: check_reviews(data, os.path.join(rundir, 'shared_reviews')),
+            ))
+        if 'one-on-one' in crawlers:
+            one_on_one_crawler = importlib.import_module('one_on_one_crawler')
+            # Small list pages so pagination is exercised
+            one_on_one_crawler.ONE_ON_ONE_PAGE_SIZE = max(1, len(data.sessions) // 3)
+            one_on_one_crawler.MEETING_TABS = tabs
+
+            rundir = os.path.join(workdir, 'one_on_one')
+            results.append(_run_crawler(
+                'one-on-one', rundir,
+                lambda: one_on_one_crawler.main(workers=workers, pipeline=True, metrics_path='metrics.json'),
+                lambda rundir: check_sessions(data, os.path.join(rundir, 'one_on_one_sessions')),
+            ))
+    finally:
+        server.shutdown()
+    return results
+
+
+def format_results(results):
+    lines = [f"{'crawler':<12}{'urls':>6}{'seconds':>10}{'pages/s':>9}{'p50':>8}{'p95':>8}{'p99':>8}  result"]
+    for result in results:
+        latency = result['url_latency']
+        if result['error']:
+            status = f"ERROR {result['error']}"
+        elif result['mismatches']:
+            status = f"{len(result['mismatches'])} mismatches"
+        else:
+            status = 'ok'
+        lines.append(f"{result['crawler']:<12}{result['urls']:>6}{result['elapsed_seconds']:>10.2f}"
+                     f"{result['pages_per_second']:>9.2f}{latency.get('p50', 0.0):>8.3f}{latency.get('p95', 0.0):>8.3f}"
+                     f"{latency.get('p99', 0.0):>8.3f}  {status}")
+        for mismatch in result['mismatches'][:10]:
+            lines.append(f'    {mismatch}')
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark both crawlers against a local mock Lemonbase server')
+    parser.add_argument('--crawler', choices=['both', 'review', 'one-on-one'], default='both')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--reviews', type=int, default=40)
+    parser.add_argument('--sessions', type=int, default=10)
+    parser.add_argument('--meetings', type=int, default=4, help='meetings per 1:1 session')
+    parser.add_argument('--conversations', type=int, default=5, help='conversations per meeting')
+    parser.add_argument('--latency', type=float, default=0.02, help='seconds added to every page response')
+    parser.add_argument('--client-redirects', action='store_true',
+                        help='redirect review and 1:1 session URLs with JavaScript instead of HTTP 302')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--tabs', type=int, default=1, help='1:1 meeting tabs per browser')
+    parser.add_argument('--keep', action='store_true', help='keep the scratch directory with the crawler outputs')
+    parser.add_argument('--json', default=None, metavar='PATH', help='also write the results as JSON')
+    args = parser.parse_args()
+
+    data = MockData(seed=args.seed, reviews=args.reviews, sessions=args.sessions,
+                    meetings_per_session=args.meetings, conversations_per_meeting=args.conversations)
+    workdir = tempfile.mkdtemp(prefix='lemonbase-benchmark-')
+    crawlers = ('review', 'one-on-one') if args.crawler == 'both' else (args.crawler,)
+    try:
+        results = run_benchmark(data, workdir, crawlers, args.workers, args.tabs, {
+            'latency': args.latency,
+            'client_redirects': args.client_redirects,
+        })
+    finally:
+        if args.keep:
+            print(f'Crawler outputs kept in {workdir}')
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+    print()
+    print(format_results(results))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    sys.exit(1 if any(result['error'] or result['mismatches'] for result in results) else 0)
@@ -0,0 +1,152 @@
+"""
+Content-hash change detection for incremental re-crawls of 1:1 sessions.
+
+- Every saved session gets a fingerprint entry: a cheap summary read from the session page alone
+  (meeting count, latest meeting date, and a hash of the conversations shown on the landing view, which
+  is the latest meeting) plus a hash per meeting (date + conversations).
+- On a refresh, a session whose summary is unchanged is skipped after a single page load. A new comment
+  on the latest meeting changes the landing-view hash, so it is picked up without a new meeting.
+- For a changed session, only the meetings that are new since the last crawl, plus the previously latest
+  meeting (the one still collecting comments), are re-extracted and merged into the stored result;
+  every other meeting is kept as stored. Their hashes tell which meetings actually changed.
+- Comments added to an older meeting are not detected; a full re-crawl (without --refresh) picks them up.
+- Fingerprints are appended to fingerprints.jsonl in the 1:1 output directory (see jsonl_log.py); an
+  existing fingerprints.json from older runs is imported on first use.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime, timezone
+
+from jsonl_log import JsonlLog
+
+_MEETING_DATE = re.compile(r'(\d{4})\s*년\s*(\d{1,2})\s*월\s*(\d{1,2})\s*일')
+
+
+def _hash(value):
+    payload = json.dumps(value, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def meeting_fingerprint(meeting):
+    """Stable hash of a meeting's date and conversations."""
+    return _hash([meeting['meeting_date'], meeting['conversations']])
+
+
+def parse_meeting_date(text):
+    """(year, month, day) of a meeting date like '2024년 6월 6일 (금)', or None."""
+    match = _MEETING_DATE.search(text or '')
+    return tuple(int(part) for part in match.groups()) if match else None
+
+
+def latest_date(dates):
+    """The most recent of the meeting date strings (the first one if none can be parsed)."""
+    parsed = [(parse_meeting_date(date), date) for date in dates if parse_meeting_date(date)]
+    if parsed:
+        return max(parsed)[1]
+    return dates[0] if dates else None
+
+
+def session_summary(dates, landing_conversations):
+    """
+    Cheap per-session summary: the meeting list plus a hash of the conversations of the landing view
+    (the latest meeting, as extracted). On a refresh these are read from the session page as loaded,
+    without opening any meeting; on a first crawl they come from the extracted latest meeting.
+    """
+    return {
+        'meeting_count': len(dates),
+        'latest_date': latest_date(dates),
+        'latest_hash': _hash(landing_conversations),
+    }
+
+
+def latest_conversations(dates, meetings):
+    """Conversations of the latest of dates among the extracted meetings ([] if it was not extracted)."""
+    latest = latest_date(dates)
+    for meeting in meetings:
+        if meeting['meeting_date'] == latest:
+            return meeting['conversations']
+    return []
+
+
+def meetings_to_refresh(dates, stored_meetings):
+    """
+    Indices (into dates) of the meetings to re-extract for a changed session: meetings that are not
+    stored yet, plus the latest stored meeting, which is the one most likely to have new comments.
+    """
+    stored_dates = {meeting['meeting_date'] for meeting in stored_meetings}
+    previous_latest = latest_date([meeting['meeting_date'] for meeting in stored_meetings])
+    return {idx for idx, date in enumerate(dates) if date not in stored_dates or date == previous_latest}
+
+
+def merge_meetings(dates, extracted, stored_meetings):
+    """
+    Session meetings in current list order: freshly extracted meetings ({index: meeting}) win,
+    the rest are taken from the stored result. Meetings found in neither are left out.
+    """
+    stored_by_date = {meeting['meeting_date']: meeting for meeting in stored_meetings}
+    merged = []
+    for idx, date in enumerate(dates):
+        meeting = extracted.get(idx) or stored_by_date.get(date)
+        if meeting is not None:
+            merged.append(meeting)
+    return merged
+
+
+class FingerprintIndex:
+    """
+    session id -> {'summary', 'meetings': {meeting_date: hash}, 'checked_at'}, persisted as an
+    append-only JSONL log. Loaded lazily on first use and safe to share between worker threads.
+    """
+
+    def __init__(self, path, legacy_path=None):
+        self.path = path
+        self._log = JsonlLog(path, legacy_path=legacy_path)
+
+    def get(self, session_id):
+        return self._log.get(session_id)
+
+    def is_unchanged(self, session_id, summary):
+        """True if session_id was fingerprinted before with the same summary."""
+        entry = self.get(session_id)
+        return entry is not None and entry['summary'] == summary
+
+    def diff(self, session_id, meetings):
+        """(new, modified, unchanged) meeting counts of meetings against the stored hashes."""
+        entry = self.get(session_id) or {'meetings': {}}
+        new = modified = unchanged = 0
+        for meeting in meetings:
+            previous = entry['meetings'].get(meeting['meeting_date'])
+            if previous is None:
+                new += 1
+            elif previous != meeting_fingerprint(meeting):
+                modified += 1
+            else:
+                unchanged += 1
+        return new, modified, unchanged
+
+    def record(self, session_id, summary, meetings):
+        """Store the summary and meeting hashes of a saved session and append them to the log."""
+        entry = {
+            'summary': summary,
+            'meetings': {meeting['meeting_date']: meeting_fingerprint(meeting) for meeting in meetings},
+            'checked_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        }
+        self._log.put(session_id, entry)
+        return entry
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def fingerprint_index(output_dir):
+    """The FingerprintIndex of a 1:1 output directory, shared by every worker in the process."""
+    with _indexes_lock:
+        if output_dir not in _indexes:
+            _indexes[output_dir] = FingerprintIndex(os.path.join(output_dir, 'fingerprints.jsonl'),
+                                                    legacy_path=os.path.join(output_dir, 'fingerprints.json'))
+        return _indexes[output_dir]
@@ -0,0 +1,74 @@
+"""
+Meeting-level checkpointing for the 1:1 crawler.
+
+- Each extracted meeting is appended to a per-session journal (session_<id>.journal.jsonl) and flushed
+  to disk immediately, so a crash, driver death or Ctrl-C loses at most the meeting in progress.
+- On resume, meetings already in the journal are skipped.
+- Once the session is complete, its meetings are saved through the result store (see result_store.py;
+  session_<id>.json files are written atomically, see atomic_io.py) and the journal is removed.
+"""
+
+import json
+import os
+
+
+class MeetingJournal:
+    """
+    Append-only journal of the meetings extracted so far for one 1:1 session.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self._load()
+
+    @classmethod
+    def for_output(cls, out_path):
+        """Journal stored next to session_<id>.json."""
+        return cls(os.path.splitext(out_path)[0] + '.journal.jsonl')
+
+    def _load(self):
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+        if data and not data.endswith(b'\n'):
+            # A crash mid-write leaves a truncated last line: drop it so new entries start on a clean line
+            data = data[:data.rfind(b'\n') + 1]
+            with open(self.path, 'wb') as f:
+                f.write(data)
+        for line in data.decode('utf-8').splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            self.entries[entry['meeting_index']] = entry
+
+    def __len__(self):
+        return len(self.entries)
+
+    def has(self, meeting_idx, meeting_date):
+        """True if this meeting (same position and date) was already journaled."""
+        entry = self.entries.get(meeting_idx)
+        return entry is not None and entry['meeting']['meeting_date'] == meeting_date
+
+    def append(self, meeting_idx, meeting):
+        """Durably record one extracted meeting ({'meeting_date', 'conversations'})."""
+        entry = {'meeting_index': meeting_idx, 'meeting': meeting}
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.entries[meeting_idx] = entry
+
+    def meetings(self):
+        """Journaled meetings in original meeting order."""
+        return [self.entries[idx]['meeting'] for idx in sorted(self.entries)]
+
+    def remove(self):
+        """Delete the journal once its meetings are saved elsewhere."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,171 @@
+"""
+Driver lifecycle manager for long crawls.
+
+- Restarts Chrome every N pages, or when the resident memory of the chromedriver/Chrome process tree
+  passes a threshold, so page speed does not degrade over a long run.
+- Detects dead or hung sessions (crashed Chrome, invalid session id, page-load timeouts),
+  relaunches and re-authenticates automatically.
+- Retries the URL that failed, up to a bounded number of attempts.
+"""
+
+import time
+import psutil
+from run_metrics import metrics
+from selenium.common.exceptions import InvalidSessionIdException, NoSuchWindowException
+
+DEFAULT_LIFECYCLE = {
+    'recycle_every': 200,
+    'max_memory_mb': 2048,
+    'max_attempts': 3,
+    'page_load_timeout': 60,
+}
+
+# Messages WebDriver/urllib3 raise when the browser or chromedriver is gone
+_DEAD_SESSION_MESSAGES = (
+    'invalid session id',
+    'chrome not reachable',
+    'disconnected',
+    'session deleted',
+    'target crashed',
+    'tab crashed',
+    'connection refused',
+    'max retries exceeded',
+    'failed to establish a new connection',
+    # Page-load timeout: the renderer is hung
+    'timed out receiving message from renderer',
+)
+
+
+def is_session_dead(exc):
+    """
+    True if exc means the browser session is gone or hung (as opposed to a missing element on a live page).
+    """
+    if isinstance(exc, (InvalidSessionIdException, NoSuchWindowException)):
+        return True
+    message = str(exc).lower()
+    return any(text in message for text in _DEAD_SESSION_MESSAGES)
+
+
+class DriverManager:
+    """
+    Owns one Chrome driver for a worker: starts it lazily, recycles it, and restarts it on failure.
+    create_driver() returns a fresh WebDriver; login(driver) authenticates it.
+    """
+
+    @classmethod
+    def from_lifecycle(cls, create_driver, login, lifecycle=None, name='driver'):
+        """Build a manager from a DEFAULT_LIFECYCLE-style dict of settings."""
+        return cls(create_driver, login, name=name, **dict(DEFAULT_LIFECYCLE, **(lifecycle or {})))
+
+    def __init__(self, create_driver, login, recycle_every=200, max_memory_mb=2048, max_attempts=3,
+                 page_load_timeout=60, name='driver'):
+        self.create_driver = create_driver
+        self.login = login
+        self.recycle_every = recycle_every
+        self.max_memory_mb = max_memory_mb
+        self.max_attempts = max_attempts
+        self.page_load_timeout = page_load_timeout
+        self.name = name
+        self._driver = None
+        self.pages_since_start = 0
+        self.restarts = 0
+        self.retries = 0
+
+    @property
+    def driver(self):
+        if self._driver is None:
+            self.start()
+        return self._driver
+
+    def start(self):
+        driver = self.create_driver()
+        try:
+            driver.set_page_load_timeout(self.page_load_timeout)
+            self.login(driver)
+        except Exception:
+            self._quit(driver)
+            raise
+        self._driver = driver
+        self.pages_since_start = 0
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def quit(self):
+        if self._driver is not None:
+            self._quit(self._driver)
+            self._driver = None
+
+    def restart(self, reason):
+        print(f"[{self.name}] Restarting Chrome: {reason}")
+        self.quit()
+        self.restarts += 1
+        metrics.count('browser_restarts')
+        self.start()
+
+    def memory_mb(self):
+        """
+        Total RSS in MB of chromedriver and every process it started (Chrome's browser, renderer and
+        GPU processes), or None if the process tree cannot be read.
+        """
+        service = getattr(self._driver, 'service', None)
+        process = getattr(service, 'process', None)
+        if process is None:
+            return None
+        try:
+            root = psutil.Process(process.pid)
+            processes = [root] + root.children(recursive=True)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return None
+        total = 0
+        for proc in processes:
+            try:
+                total += proc.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                # Exited (e.g. a renderer closed with its tab) between listing and reading
+                continue
+        return total / (1024 * 1024)
+
+    def _check_health(self):
+        if self._driver is None:
+            return
+        if self.recycle_every and self.pages_since_start >= self.recycle_every:
+            self.restart(f'recycling after {self.pages_since_start} pages')
+            return
+        try:
+            # Liveness probe: raises if the session is dead or the renderer is hung
+            self._driver.execute_script('return 1;')
+        except Exception as e:
+            self.restart(f'session is not responding ({e.__class__.__name__})')
+            return
+        memory = self.memory_mb() if self.max_memory_mb else None
+        if memory is not None and memory > self.max_memory_mb:
+            self.restart(f'Chrome process tree RSS at {memory:.0f} MB')
+
+    def run(self, url, process_url):
+        """
+        Run process_url(driver, url) with a healthy driver, restarting Chrome and retrying on
+        dead/hung sessions, up to max_attempts. Re-raises the last error when attempts run out.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                self._check_health()
+                result = process_url(self.driver, url)
+                self.pages_since_start += 1
+                return result
+            except Exception as e:
+                if attempt == self.max_attempts:
+                    raise
+                self.retries += 1
+                metrics.count('retries')
+                print(f"[{self.name}] Attempt {attempt}/{self.max_attempts} failed for {url}: {e.__class__.__name__}: {e}")
+                if is_session_dead(e):
+                    try:
+                        self.restart('dead or hung session')
+                    except Exception as restart_error:
+                        print(f"[{self.name}] Restart failed: {restart_error}")
+                        self.quit()
+                time.sleep(min(2 ** attempt, 30))
@@ -0,0 +1,150 @@
+"""
+Single-round-trip in-page extraction shared by the Lemonbase crawlers.
+
+Instead of one WebDriver call per element (find_elements, .text, get_attribute, ...),
+each extraction runs one execute_script() that walks the DOM in the page and returns structured JSON.
+The Python side then applies the same filtering and ordering as the element-by-element code,
+so the saved output is unchanged.
+"""
+
+MEETING_DATE_SELECTOR = 'div.typography-body2-bold.text-secondary.css-avbo3m.essl35z0'
+CONVERSATION_BLOCK_SELECTOR = 'div[data-rbd-draggable-context-id][data-rbd-draggable-id]'
+COMMENT_INPUT_SELECTOR = "textarea[placeholder='코멘트 입력']"
+AVATAR_IMG_SELECTOR = 'span.ant-avatar img'
+REVIEW_BLOCK_SELECTOR = 'div.css-1veelxu'
+REVIEW_HEADLINE_SELECTOR = 'div.css-tojoty .typography-headline6.grow'
+
+# Rendered text the way WebDriver's element.text reports it, and the same walk as
+# offline_parser.visible_text(): collapse whitespace, one line break at block boundaries and <br>,
+# skip non-rendered and hidden elements, non-breaking spaces as plain spaces, each line stripped.
+# (innerText differs: it puts blank lines around <p> and returns text of display:none nodes.)
+# Block/hidden come from the computed style here, from the tag name offline.
+_VISIBLE_TEXT_JS = """
+var SKIP_TAGS = {HEAD: 1, NOSCRIPT: 1, SCRIPT: 1, STYLE: 1, TEMPLATE: 1, TEXTAREA: 1, TITLE: 1};
+function visibleText(el) {
+  var BREAK = {};
+  var parts = [];
+  function walk(node) {
+    var hidden = window.getComputedStyle(node).visibility === 'hidden';
+    for (var child = node.firstChild; child; child = child.nextSibling) {
+      if (child.nodeType === 3) {
+        if (!hidden) { parts.push(child.data.replace(/[ \\t\\n\\r\\f]+/g, ' ')); }
+      } else if (child.nodeType === 1) {
+        var tag = child.tagName.toUpperCase();
+        if (tag === 'BR') { parts.push('\\n'); continue; }
+        if (SKIP_TAGS[tag]) { continue; }
+        var display = window.getComputedStyle(child).display;
+        if (display === 'none') { continue; }
+        var block = !(display.indexOf('inline') === 0 || display === 'contents');
+        if (block) { parts.push(BREAK); }
+        walk(child);
+        if (block) { parts.push(BREAK); }
+      }
+    }
+  }
+  walk(el);
+  var text = '';
+  var pendingBreak = false;
+  for (var i = 0; i < parts.length; i++) {
+    var part = parts[i];
+    if (part === BREAK) { pendingBreak = true; continue; }
+    var atLineStart = !text || text.charAt(text.length - 1) === '\\n';
+    if (part === ' ' && (atLineStart || pendingBreak || text.charAt(text.length - 1) === ' ')) { continue; }
+    if (pendingBreak && !atLineStart) { text += '\\n'; }
+    pendingBreak = false;
+    text += part;
+  }
+  return text.replace(/\\u00a0/g, ' ').split('\\n').map(function (line) {
+    return line.replace(/^ +| +$/g, '');
+  }).join('\\n');
+}
+"""
+
+_MEETING_JS = _VISIBLE_TEXT_JS + """
+var blocks = document.querySelectorAll(arguments[0]);
+var items = [];
+for (var b = 0; b < blocks.length; b++) {
+  var childIndex = 0;
+  var children = blocks[b].children;
+  for (var c = 0; c < children.length; c++) {
+    var child = children[c];
+    if (child.tagName !== 'DIV') { continue; }
+    var index = childIndex++;
+    if (child.querySelector(arguments[1])) { continue; }
+    var img = child.querySelector(arguments[2]);
+    items.push({
+      block_index: b,
+      child_index: index,
+      text: visibleText(child),
+      avatar_url: img ? (img.hasAttribute('src') ? img.src : null) : '',
+      author_name: img ? (img.getAttribute('alt') || '').trim() : ''
+    });
+  }
+}
+return items;
+"""
+
+_SHARED_REVIEW_JS = _VISIBLE_TEXT_JS + """
+function texts(selector) {
+  return Array.prototype.map.call(document.querySelectorAll(selector), visibleText);
+}
+return {headlines: texts(arguments[0]), blocks: texts(arguments[1])};
+"""
+
+
+def extract_meeting_conversations(driver):
+    """
+    Extract all conversations of the currently displayed meeting in one round trip.
+    Returns a list of {'block_index', 'child_index', 'text', 'avatar_url'} dicts, skipping
+    comment-input blocks and blocks without text. 'author_name' is added when the avatar has alt text
+    (see author_registry.py).
+    """
+    items = driver.execute_script(_MEETING_JS, CONVERSATION_BLOCK_SELECTOR, COMMENT_INPUT_SELECTOR, AVATAR_IMG_SELECTOR)
+    conversations = []
+    for item in items or []:
+        text = item['text'].strip()
+        if text:
+            conversation = {
+                'block_index': item['block_index'],
+                'child_index': item['child_index'],
+                'text': text,
+                'avatar_url': item['avatar_url']
+            }
+            if item.get('author_name'):
+                conversation['author_name'] = item['author_name']
+            conversations.append(conversation)
+    return conversations
+
+
+def extract_shared_review(driver):
+    """
+    Extract the headline texts and review block texts of a shared-review page in one round trip.
+    Returns (headlines, blocks) as lists of raw (unstripped) texts, one per matching element.
+    """
+    result = driver.execute_script(_SHARED_REVIEW_JS, REVIEW_HEADLINE_SELECTOR, REVIEW_BLOCK_SELECTOR) or {}
+    return result.get('headlines', []), result.get('blocks', [])
+
+
+def shared_review_id(final_url):
+    """
+    Return the review ID of a shared-review final URL (second-to-last path segment).
+    """
+    stripped = final_url.rstrip('/')
+    return stripped.split('/')[-2] if stripped.endswith('shared-review') else stripped.split('/')[-1]
+
+
+def format_shared_review(headlines, blocks):
+    """
+    Format shared-review texts the way shared-review-<id>.txt stores them:
+    non-empty headlines first as '[Headline]' entries, then the review blocks, each followed by '---'.
+    """
+    parts = []
+    for headline_text in headlines:
+        headline_text = headline_text.strip()
+        if headline_text:
+            parts.append('[Headline]\n' + headline_text + '\n---\n')
+    for text in blocks:
+        text = text.strip()
+        if text:
+            parts.append(text + '\n---\n')
+    return ''.join(parts)
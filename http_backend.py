@@ -0,0 +1,190 @@
+"""
+Browserless HTTP extraction for server-rendered Lemonbase pages (library only, not a crawler option).
+
+The current lemonbase.com app renders and redirects on the client, and its JSON endpoints are not
+known here, so the crawlers always use Chrome. This module is kept for server-rendered deployments
+and is exercised against mock_lemonbase.py (tests/test_http_backend.py).
+
+- Takes the authenticated cookies from a Selenium login (or the session cache) and fetches the
+  1:1 and review pages through one pooled, keep-alive requests.Session with bounded concurrency.
+- Parses the server-rendered HTML with the same selectors as offline_parser.py and saves the same
+  results through the crawler's result store (session_<id>.json / shared-review-<id>.txt by default).
+- URLs it cannot handle (not server-rendered, unexpected redirect, logged out, HTTP error) are returned
+  so the caller can fall back to Chrome for just those.
+- The first URL is fetched alone as a probe. Once any page turns out not to be server-rendered
+  (client-side redirect, content rendered by script), the backend switches itself off and returns every
+  remaining URL for the browser without requesting it.
+"""
+
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from extraction import shared_review_id
+from offline_parser import parse_meeting_html, parse_shared_review_html
+from result_store import open_store
+from author_registry import prepare_meetings
+from run_metrics import metrics
+
+DEFAULT_CONCURRENCY = 8
+REQUEST_TIMEOUT = 20
+
+_SCHEDULE_HREF = re.compile(r'href="([^"]*/one-on-one/[^"/]+/schedules/[^"/?#]+)"')
+
+
+class FallbackRequired(Exception):
+    """Raised when a page cannot be handled over plain HTTP and needs the browser."""
+
+
+class NotServerRendered(FallbackRequired):
+    """Raised when the site renders or redirects on the client; no later page will work over HTTP either."""
+
+
+class HttpBackend:
+    """
+    Fetch and extract pages with a pooled requests.Session shared by up to `concurrency` threads.
+    """
+
+    def __init__(self, cookies, user_agent=None, concurrency=DEFAULT_CONCURRENCY):
+        self.concurrency = concurrency
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        if user_agent:
+            self.session.headers['User-Agent'] = user_agent
+        for cookie in cookies:
+            self.session.cookies.set(cookie['name'], cookie['value'], domain=cookie.get('domain', ''), path=cookie.get('path', '/'))
+        self._logged_out = threading.Event()
+        self._client_rendered = threading.Event()
+
+    @classmethod
+    def from_driver(cls, driver, concurrency=DEFAULT_CONCURRENCY):
+        """
+        Build a backend that reuses the cookies and user agent of a logged-in Selenium driver.
+        """
+        return cls(driver.get_cookies(), driver.execute_script('return navigator.userAgent'), concurrency)
+
+    def close(self):
+        self.session.close()
+
+    def get(self, url):
+        """
+        GET url (following server-side redirects). Raises FallbackRequired on errors or when logged out.
+        """
+        if self._logged_out.is_set():
+            raise FallbackRequired('session is logged out')
+        if self._client_rendered.is_set():
+            raise FallbackRequired('HTTP backend disabled: pages are not server-rendered')
+        try:
+            with metrics.span('http_get'):
+                response = self.session.get(url, timeout=REQUEST_TIMEOUT)
+        except requests.RequestException as e:
+            raise FallbackRequired(f'request failed: {e}')
+        if '/login' in urlparse(response.url).path:
+            self._logged_out.set()
+            raise FallbackRequired('redirected to login')
+        if response.status_code != 200:
+            raise FallbackRequired(f'HTTP {response.status_code}')
+        response.encoding = response.encoding or 'utf-8'
+        return response
+
+    def fetch_review(self, url, store):
+        """
+        Resolve a review URL and save the shared review to store like process_review_url().
+        Returns the final URL.
+        """
+        response = self.get(url)
+        final_url = response.url
+        if 'write-review' in final_url:
+            return final_url
+        if 'shared-review' not in final_url:
+            raise NotServerRendered(f'unexpected final URL {final_url}')
+        headlines, blocks = parse_shared_review_html(response.text)
+        if not blocks:
+            raise NotServerRendered('no review blocks in server-rendered HTML')
+        store.save_review(shared_review_id(final_url), headlines, blocks)
+        return final_url
+
+    def fetch_session(self, url, session_id, store, inline_avatars=False):
+        """
+        Fetch a 1:1 session and every meeting's /schedules/<id> page, and save the session to store
+        like process_one_on_one_url(). Returns where it was saved.
+        """
+        response = self.get(url)
+        schedule_urls = []
+        for href in _SCHEDULE_HREF.findall(response.text):
+            schedule_url = urljoin(response.url, href)
+            if schedule_url not in schedule_urls:
+                schedule_urls.append(schedule_url)
+        if not schedule_urls:
+            raise NotServerRendered('no meeting schedule links in server-rendered HTML')
+        session_results = []
+        for meeting_idx, schedule_url in enumerate(schedule_urls):
+            meeting_response = self.get(schedule_url)
+            meeting = parse_meeting_html(meeting_response.text, meeting_idx, meeting_response.url)
+            if meeting is not None:
+                session_results.append(meeting)
+        session_results = prepare_meetings(session_results, store, inline_avatars)
+        return f'{len(session_results)} meetings saved to {store.save_session(session_id, session_results)}'
+
+    def run(self, urls, fetch):
+        """
+        Run fetch(url) over urls with bounded concurrency, after fetching the first URL alone as a probe.
+        Returns the URLs that need the browser fallback, in input order.
+        """
+        def attempt(url):
+            if self._client_rendered.is_set():
+                metrics.count('http_fallbacks')
+                return url
+            try:
+                with metrics.span('url'):
+                    result = fetch(url)
+                print(f"[http] {url} -> {result}")
+                metrics.count('urls')
+                return None
+            except NotServerRendered as e:
+                if not self._client_rendered.is_set():
+                    self._client_rendered.set()
+                    print(f"[http] {url} is not server-rendered ({e}); sending the remaining URLs to the browser")
+                metrics.count('http_fallbacks')
+                return url
+            except FallbackRequired as e:
+                print(f"[http] {url} needs browser fallback: {e}")
+                metrics.count('http_fallbacks')
+                return url
+
+        if not urls:
+            return []
+        fallback_urls = [url for url in [attempt(urls[0])] if url is not None]
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            return fallback_urls + [url for url in pool.map(attempt, urls[1:]) if url is not None]
+
+    def process_review_urls(self, urls, output_dir='shared_reviews', on_resolved=None, store=None):
+        """
+        on_resolved(url, final_url), if given, is called for every review handled over HTTP.
+        Reviews are saved to store (default: the file layout in output_dir).
+        """
+        store = store or open_store(output_dir)
+
+        def fetch(url):
+            final_url = self.fetch_review(url, store)
+            if on_resolved is not None:
+                on_resolved(url, final_url)
+            return final_url
+
+        return self.run(urls, fetch)
+
+    def process_one_on_one_urls(self, urls, output_dir='one_on_one_sessions', store=None, inline_avatars=False):
+        """
+        Sessions are saved to store (default: the file layout in output_dir), with conversations
+        referencing authors by id unless inline_avatars is set.
+        """
+        store = store or open_store(output_dir)
+
+        def fetch(url):
+            return self.fetch_session(url, url.rstrip('/').split('/')[-1], store, inline_avatars)
+
+        return self.run(urls, fetch)
@@ -0,0 +1,71 @@
+"""
+Append-only JSON Lines log of keyed entries, used by the persistent crawl indexes.
+
+- Each update appends one {"key", "entry"} line instead of rewriting the whole file, so a record is
+  O(1) I/O and the lock is only held for a single write.
+- On load the lines are replayed (the last entry per key wins) and the log is compacted to one line per key.
+- A truncated last line (e.g. the process was killed mid-write) is ignored.
+- If the log does not exist yet, entries are imported from legacy_path, the whole-file JSON object
+  ({key: entry}) the indexes used to be stored in.
+"""
+
+import json
+import os
+import threading
+from atomic_io import write_text_atomic
+
+
+class JsonlLog:
+    """
+    key -> entry mapping backed by an append-only JSONL file.
+    Loaded lazily on first use and safe to share between worker threads.
+    """
+
+    def __init__(self, path, legacy_path=None):
+        self.path = path
+        self.legacy_path = legacy_path
+        self._entries = None
+        self._lock = threading.Lock()
+
+    def _read(self):
+        entries = {}
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    entries[record['key']] = record['entry']
+        elif self.legacy_path:
+            try:
+                with open(self.legacy_path, 'r', encoding='utf-8') as f:
+                    entries = json.load(f)
+            except (OSError, ValueError):
+                entries = {}
+        return entries
+
+    def _load(self):
+        if self._entries is None:
+            self._entries = self._read()
+            self._compact()
+        return self._entries
+
+    def _compact(self):
+        if not self._entries and not os.path.exists(self.path):
+            return
+        lines = [json.dumps({'key': key, 'entry': entry}, ensure_ascii=False) + '\n'
+                 for key, entry in self._entries.items()]
+        write_text_atomic(''.join(lines), self.path)
+
+    def get(self, key):
+        with self._lock:
+            return self._load().get(key)
+
+    def put(self, key, entry):
+        """Set key to entry and append it to the log."""
+        line = json.dumps({'key': key, 'entry': entry}, ensure_ascii=False) + '\n'
+        with self._lock:
+            self._load()[key] = entry
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
@@ -0,0 +1,164 @@
+"""
+Lean Chrome driver factory shared by the Lemonbase crawlers.
+
+The crawlers only read element text and the avatar src attribute, never image bytes, fonts or
+third-party scripts. A lean driver:
+- blocks images through Chrome prefs (img src attributes are still readable),
+- blocks images, fonts, media and analytics/tracking scripts by URL pattern
+  with CDP Network.setBlockedURLs (per tab: call block_resources() again after opening a new tab),
+- blocks stylesheet files only when asked to (block_stylesheets=True / --block-css): stylesheets decide
+  which elements are visible and laid out as blocks, so dropping them can change the extracted text,
+- turns off browser features a crawl never needs (extensions, sync, background networking, ...).
+
+Comparison (standard vs lean, per crawled page load time and bytes transferred):
+    python lean_driver.py compare review_urls.txt [--limit 10] [--block-css]
+The comparison reuses the session cache (see session_cache.py) when it is present.
+"""
+
+import time
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+BASE_ARGUMENTS = ['--headless', '--no-sandbox', '--disable-dev-shm-usage']
+
+LEAN_ARGUMENTS = [
+    '--disable-extensions',
+    '--disable-background-networking',
+    '--disable-background-timer-throttling',
+    '--disable-component-update',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--disable-notifications',
+    '--disable-features=Translate,MediaRouter,OptimizationHints,AutofillServerCommunication',
+    '--mute-audio',
+    '--no-first-run',
+    '--blink-settings=imagesEnabled=false',
+]
+
+LEAN_PREFS = {
+    'profile.managed_default_content_settings.images': 2,
+    'profile.default_content_setting_values.notifications': 2,
+    'profile.default_content_setting_values.geolocation': 2,
+    'profile.default_content_setting_values.media_stream': 2,
+}
+
+BLOCKED_URL_PATTERNS = [
+    # Images and avatars (the crawlers only need the src attribute)
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico', '*.avif',
+    # Web fonts
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    # Media
+    '*.mp4', '*.webm', '*.mp3',
+    # Analytics, tracking and support widgets
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*', '*facebook.net*',
+    '*hotjar.com*', '*amplitude.com*', '*mixpanel.com*', '*segment.io*', '*segment.com*',
+    '*intercom.io*', '*intercomcdn.com*', '*channel.io*', '*sentry.io*', '*datadoghq*',
+    '*clarity.ms*', '*fullstory.com*', '*braze.com*',
+]
+
+# Opt-in: stylesheet files (the app's own emotion css-* classes are injected by script and still apply,
+# but anything styled from a .css file may change visibility and therefore the extracted text)
+STYLESHEET_URL_PATTERNS = ['*.css']
+
+
+def chrome_options(lean=True):
+    options = Options()
+    for argument in BASE_ARGUMENTS:
+        options.add_argument(argument)
+    if lean:
+        for argument in LEAN_ARGUMENTS:
+            options.add_argument(argument)
+        options.add_experimental_option('prefs', LEAN_PREFS)
+    return options
+
+
+def create_driver(lean=True, block_stylesheets=False):
+    """
+    Launch headless Chrome with the crawlers' standard options, plus resource blocking when lean.
+    """
+    driver = webdriver.Chrome(options=chrome_options(lean))
+    if lean:
+        block_resources(driver, block_stylesheets)
+    return driver
+
+
+def block_resources(driver, block_stylesheets=False):
+    """
+    Block BLOCKED_URL_PATTERNS (plus STYLESHEET_URL_PATTERNS if block_stylesheets) in the driver's current tab.
+    CDP network settings only apply to the tab they were sent to, so tabs opened later need their own call.
+    """
+    patterns = BLOCKED_URL_PATTERNS + (STYLESHEET_URL_PATTERNS if block_stylesheets else [])
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+
+
+_PAGE_METRICS_JS = """
+var nav = performance.getEntriesByType('navigation')[0];
+var resources = performance.getEntriesByType('resource');
+var bytes = nav ? (nav.transferSize || 0) : 0;
+for (var i = 0; i < resources.length; i++) { bytes += resources[i].transferSize || 0; }
+return {
+  load_ms: nav ? nav.loadEventEnd - nav.startTime : null,
+  bytes: bytes,
+  requests: resources.length + 1
+};
+"""
+
+
+def measure_page(driver, url, settle_seconds=3):
+    """
+    Load url and return its navigation load time, bytes transferred and request count.
+    Resources requested after load (within settle_seconds) are included in the byte count.
+    """
+    driver.get(url)
+    time.sleep(settle_seconds)
+    return driver.execute_script(_PAGE_METRICS_JS)
+
+
+def compare(urls, prepare=None, settle_seconds=3, block_stylesheets=False):
+    """
+    Load the same urls with a standard and a lean driver (blocking stylesheets too if block_stylesheets)
+    and print per-page averages and the drop.
+    prepare(driver), if given, runs once per driver before measuring (e.g. to restore a login).
+    Returns {'standard': {...}, 'lean': {...}} averages.
+    """
+    averages = {}
+    for mode, lean in (('standard', False), ('lean', True)):
+        driver = create_driver(lean, block_stylesheets)
+        try:
+            if prepare is not None:
+                prepare(driver)
+            samples = [measure_page(driver, url, settle_seconds) for url in urls]
+        finally:
+            driver.quit()
+        load_times = [s['load_ms'] for s in samples if s['load_ms'] is not None]
+        averages[mode] = {
+            'load_ms': sum(load_times) / len(load_times) if load_times else 0.0,
+            'bytes': sum(s['bytes'] for s in samples) / len(samples) if samples else 0.0,
+            'requests': sum(s['requests'] for s in samples) / len(samples) if samples else 0.0,
+        }
+    print(f"{'per page':<12}{'standard':>14}{'lean':>14}{'drop':>10}")
+    for key, unit in (('load_ms', 'ms'), ('bytes', 'B'), ('requests', '')):
+        standard, lean = averages['standard'][key], averages['lean'][key]
+        drop = (1 - lean / standard) * 100 if standard else 0.0
+        print(f"{key:<12}{standard:>12.0f}{unit:>2}{lean:>12.0f}{unit:>2}{drop:>9.1f}%")
+    return averages
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Lean Chrome driver utilities')
+    parser.add_argument('command', choices=['compare'])
+    parser.add_argument('url_file', help='file with one URL per line (e.g. review_urls.txt or 1_1_urls.txt)')
+    parser.add_argument('--limit', type=int, default=10, help='number of URLs to load per mode (default: 10)')
+    parser.add_argument('--block-css', action='store_true', help='also block stylesheet files in the lean driver')
+    args = parser.parse_args()
+    with open(args.url_file, 'r', encoding='utf-8') as f:
+        urls = [line.strip() for line in f if line.strip()][:args.limit]
+
+    def prepare(driver):
+        from session_cache import restore_session
+        if not restore_session(driver):
+            print('No valid session cache; measuring pages without logging in')
+
+    compare(urls, prepare, block_stylesheets=args.block_css)
@@ -0,0 +1,357 @@
+"""
+Local stand-in for the Lemonbase pages the crawlers read, for offline testing.
+
+- Serves a login form (#email/#password) that sets a session cookie; /app/* pages require it.
+- The review list (/app/reviews?page=N) and the 1:1 list (/app/one-on-one?...[pagination][current]=N&...[pageSize]=M)
+  render paginated tr.ant-table-row[data-row-key] tables; the review list pages with an
+  ul.ant-pagination next button like the real app.
+- Review URLs redirect to shared-review or write-review pages; shared reviews use the real
+  div.css-tojoty headline and div.css-1veelxu block markup.
+- 1:1 sessions list their meeting dates with the real date classes and render conversations with the
+  data-rbd-draggable-* markup. Each meeting also has its own /schedules/<id> route, and clicking a
+  date swaps the conversation in place (like the real single-page app).
+- Optional per-request latency, and client-side (JavaScript) instead of HTTP redirects for review
+  and 1:1 session URLs, to mimic the real single-page app.
+- MockData also produces the expected crawler outputs (ground truth) for the generated data.
+
+Usage:
+    python mock_lemonbase.py [--port 8765] [--latency 0.05] [--client-redirects]
+"""
+
+import json
+import random
+import re
+import secrets
+import threading
+import time
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from extraction import format_shared_review
+from author_registry import author_id
+
+SESSION_COOKIE = 'lb_session'
+MEETING_DATE_CLASSES = 'typography-body2-bold text-secondary css-avbo3m essl35z0'
+AVATAR_BASE_URL = 'https://static.lemonbase.test/avatars/'
+WEEKDAYS = ['월', '화', '수', '목', '금', '토', '일']
+
+_CLICK_SCRIPT = """
+<script>
+document.addEventListener('click', function (event) {
+  var link = event.target.closest('a.schedule-link');
+  if (!link) { return; }
+  event.preventDefault();
+  fetch(link.getAttribute('href')).then(function (r) { return r.text(); }).then(function (html) {
+    var doc = new DOMParser().parseFromString(html, 'text/html');
+    document.getElementById('conversation').innerHTML = doc.getElementById('conversation').innerHTML;
+    history.pushState({}, '', link.getAttribute('href'));
+  });
+});
+</script>
+"""
+
+
+class MockData:
+    """
+    Deterministic synthetic reviews and 1:1 sessions, plus the expected crawler outputs for them.
+    """
+
+    def __init__(self, seed=0, reviews=10, shared_ratio=0.5, sessions=5, meetings_per_session=4,
+                 conversations_per_meeting=3, authors=4):
+        rng = random.Random(seed)
+        self.authors = [f'{AVATAR_BASE_URL}{i}.png' for i in range(authors)]
+        self.author_names = [f'Author {i}' for i in range(authors)]
+        self.reviews = {}
+        for i in range(reviews):
+            review_id = f'review-{i:04d}'
+            if rng.random() < shared_ratio:
+                self.reviews[review_id] = {
+                    'shared': True,
+                    'headlines': [f'Review {i} headline'],
+                    'blocks': [f'Review {i} block {j}\nsecond line' for j in range(rng.randint(1, 4))],
+                }
+            else:
+                self.reviews[review_id] = {'shared': False}
+        self.sessions = {}
+        for i in range(sessions):
+            session_id = f'session-{i:04d}'
+            meetings = []
+            for j in range(meetings_per_session):
+                day = j + 1
+                meetings.append({
+                    'schedule_id': f'{session_id}-schedule-{j:03d}',
+                    'meeting_date': f'2024년 6월 {day}일 ({WEEKDAYS[day % 7]})',
+                    'conversations': [
+                        {'author': rng.randrange(authors), 'text': f'Session {i} meeting {j} comment {k}'}
+                        for k in range(conversations_per_meeting)
+                    ],
+                })
+            self.sessions[session_id] = meetings
+
+    def expected_session(self, session_id, inline_avatars=False):
+        """
+        Expected content of session_<id>.json (as Python objects): conversations reference authors by id,
+        or carry the full avatar_url with inline_avatars.
+        """
+        def author_field(author):
+            if inline_avatars:
+                return {'avatar_url': self.authors[author]}
+            return {'author_id': author_id(self.authors[author])}
+
+        return [
+            {
+                'meeting_date': meeting['meeting_date'],
+                'conversations': [
+                    {
+                        'block_index': block_idx,
+                        'child_index': 0,
+                        'text': conversation['text'],
+                        **author_field(conversation['author']),
+                    }
+                    for block_idx, conversation in enumerate(meeting['conversations'])
+                ],
+            }
+            for meeting in self.sessions[session_id]
+        ]
+
+    def expected_authors(self):
+        """Expected content of authors.json: every author appearing in a 1:1 conversation."""
+        used = {conversation['author'] for meetings in self.sessions.values()
+                for meeting in meetings for conversation in meeting['conversations']}
+        return {author_id(self.authors[author]): {'avatar_url': self.authors[author], 'name': self.author_names[author]}
+                for author in sorted(used)}
+
+    def expected_review(self, review_id):
+        """Expected content of shared-review-<id>.txt, or None for write-review pages."""
+        review = self.reviews[review_id]
+        if not review['shared']:
+            return None
+        return format_shared_review(review['headlines'], review['blocks'])
+
+
+def _page(title, body):
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{escape(title)}</title></head>'
+            f'<body>{body}</body></html>')
+
+
+def render_login():
+    return _page('Login', (
+        '<form method="post" action="/login">'
+        '<input id="email" name="email" type="email">'
+        '<input id="password" name="password" type="password">'
+        '<button type="submit">Login</button>'
+        '</form>'
+    ))
+
+
+def render_review_list(data, page, page_size):
+    review_ids = list(data.reviews)
+    rows = ''.join(
+        f'<tr class="ant-table-row" data-row-key="{review_id}"><td>{escape(review_id)}</td>'
+        f'<td><a href="/app/reviews/{review_id}">Review {escape(review_id)}</a></td></tr>'
+        for review_id in review_ids[(page - 1) * page_size:page * page_size]
+    )
+    last_page = page * page_size >= len(review_ids)
+    pagination = (
+        '<ul class="ant-pagination">'
+        f'<li class="ant-pagination-next" aria-disabled="{"true" if last_page else "false"}">'
+        f'<button type="button" onclick="window.location.href = \'/app/reviews?page={page + 1}\'">Next</button>'
+        '</li></ul>'
+    )
+    table = f'<table><tbody>{rows}</tbody></table>' if rows else '<div class="ant-table-placeholder">No data</div>'
+    return _page('Reviews', table + pagination)
+
+
+def render_one_on_one_list(data, page, page_size):
+    session_ids = list(data.sessions)[(page - 1) * page_size:page * page_size]
+    rows = ''.join(
+        f'<tr class="ant-table-row" data-row-key="{session_id}"><td>{escape(session_id)}</td></tr>'
+        for session_id in session_ids
+    )
+    table = f'<table><tbody>{rows}</tbody></table>' if rows else '<div class="ant-table-placeholder">No data</div>'
+    return _page('1:1', table)
+
+
+def render_client_redirect(location, delay):
+    """A page that redirects with JavaScript after delay seconds, like the real app's router."""
+    return _page('Loading', (
+        '<div class="loading">Loading...</div>'
+        f'<script>setTimeout(function () {{ window.location.replace({json.dumps(location)}); }}, {int(delay * 1000)});</script>'
+    ))
+
+
+def render_shared_review(review):
+    headlines = ''.join(f'<div class="typography-headline6 grow">{escape(h)}</div>' for h in review['headlines'])
+    blocks = ''.join(
+        '<div class="css-1veelxu">' + '<br>'.join(escape(line) for line in block.split('\n')) + '</div>'
+        for block in review['blocks']
+    )
+    return _page('Shared review', f'<div class="css-tojoty">{headlines}</div>{blocks}')
+
+
+def render_meeting(data, session_id, meeting_idx):
+    meetings = data.sessions[session_id]
+    dates = ''.join(
+        f'<a class="schedule-link" href="/app/one-on-one/{session_id}/schedules/{m["schedule_id"]}">'
+        f'<div class="{MEETING_DATE_CLASSES}">{escape(m["meeting_date"])}</div></a>'
+        for m in meetings
+    )
+    blocks = []
+    for block_idx, conversation in enumerate(meetings[meeting_idx]['conversations']):
+        blocks.append(
+            f'<div data-rbd-draggable-context-id="0" data-rbd-draggable-id="{meeting_idx}-{block_idx}">'
+            f'<div><span class="ant-avatar"><img src="{data.authors[conversation["author"]]}" '
+            f'alt="{escape(data.author_names[conversation["author"]])}"></span>'
+            f'<p>{escape(conversation["text"])}</p></div>'
+            '<div><textarea placeholder="코멘트 입력"></textarea></div>'
+            '</div>'
+        )
+    body = f'<div id="meetings">{dates}</div><div id="conversation">{"".join(blocks)}</div>{_CLICK_SCRIPT}'
+    return _page('1:1', body)
+
+
+class MockLemonbaseHandler(BaseHTTPRequestHandler):
+    server_version = 'MockLemonbase/1.0'
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def data(self):
+        return self.server.data
+
+    def _send(self, status, body='', content_type='text/html; charset=utf-8', headers=None):
+        payload = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _redirect(self, location, headers=None):
+        self._send(302, '', headers=dict(headers or {}, Location=location))
+
+    def _app_redirect(self, location):
+        """Redirect the way the app's router does: client-side if the server is configured for it."""
+        if self.server.client_redirects:
+            return self._send(200, render_client_redirect(location, self.server.redirect_delay))
+        return self._redirect(location)
+
+    def _delay(self):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+    def _authenticated(self):
+        cookies = self.headers.get('Cookie', '')
+        match = re.search(rf'(?:^|;\s*){SESSION_COOKIE}=([^;]+)', cookies)
+        return match is not None and match.group(1) in self.server.tokens
+
+    def do_POST(self):
+        self._delay()
+        if urlparse(self.path).path != '/login':
+            return self._send(404, 'Not found')
+        length = int(self.headers.get('Content-Length') or 0)
+        form = parse_qs(self.rfile.read(length).decode('utf-8'))
+        if not form.get('email') or not form.get('password'):
+            return self._send(200, render_login())
+        token = secrets.token_hex(16)
+        self.server.tokens.add(token)
+        self._redirect('/app/reviews?page=1', {'Set-Cookie': f'{SESSION_COOKIE}={token}; Path=/'})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        path = url.path
+        if path == '/robots.txt':
+            return self._send(200, 'User-agent: *\n', 'text/plain')
+        self._delay()
+        if path == '/login':
+            return self._send(200, render_login())
+        if not path.startswith('/app/'):
+            return self._send(404, 'Not found')
+        if not self._authenticated():
+            return self._redirect('/login')
+        return self.route_app(path, parse_qs(url.query))
+
+    def route_app(self, path, query=None):
+        query = query or {}
+        if path.rstrip('/') == '/app/reviews':
+            page = int(query.get('page', ['1'])[0])
+            return self._send(200, render_review_list(self.data, page, self.server.review_page_size))
+        if path.rstrip('/') == '/app/one-on-one':
+            page = int(query.get('one_on_one_home[pagination][current]', ['1'])[0])
+            page_size = int(query.get('one_on_one_home[pagination][pageSize]', ['10'])[0])
+            return self._send(200, render_one_on_one_list(self.data, page, page_size))
+        match = re.fullmatch(r'/app/reviews/([^/]+)(?:/(shared-review|write-review))?/?', path)
+        if match and match.group(1) in self.data.reviews:
+            review_id, kind = match.groups()
+            review = self.data.reviews[review_id]
+            target = 'shared-review' if review['shared'] else 'write-review'
+            if kind is None:
+                return self._app_redirect(f'/app/reviews/{review_id}/{target}')
+            if kind != target:
+                return self._redirect(f'/app/reviews/{review_id}/{target}')
+            if review['shared']:
+                return self._send(200, render_shared_review(review))
+            return self._send(200, _page('Write review', '<textarea></textarea>'))
+        match = re.fullmatch(r'/app/one-on-one/([^/]+)(?:/schedules/([^/]+))?/?', path)
+        if match and match.group(1) in self.data.sessions:
+            session_id, schedule_id = match.groups()
+            meetings = self.data.sessions[session_id]
+            if schedule_id is None:
+                return self._app_redirect(f'/app/one-on-one/{session_id}/schedules/{meetings[-1]["schedule_id"]}')
+            for meeting_idx, meeting in enumerate(meetings):
+                if meeting['schedule_id'] == schedule_id:
+                    return self._send(200, render_meeting(self.data, session_id, meeting_idx))
+        return self._send(404, 'Not found')
+
+
+class MockLemonbaseServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, data, host='127.0.0.1', port=0, handler=MockLemonbaseHandler, latency=0.0,
+                 client_redirects=False, redirect_delay=0.1, review_page_size=10):
+        super().__init__((host, port), handler)
+        self.data = data
+        self.tokens = set()
+        # Seconds added to every page response (not robots.txt)
+        self.latency = latency
+        # Redirect review and 1:1 session URLs with JavaScript after redirect_delay seconds instead of a 302
+        self.client_redirects = client_redirects
+        self.redirect_delay = redirect_delay
+        self.review_page_size = review_page_size
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+
+def start_mock_server(data=None, host='127.0.0.1', port=0, **options):
+    """
+    Start a mock server in a background thread. Returns the server; call server.shutdown() to stop it.
+    options are passed to MockLemonbaseServer (latency, client_redirects, redirect_delay, review_page_size).
+    """
+    server = MockLemonbaseServer(data or MockData(), host, port, **options)
+    threading.Thread(target=server.serve_forever, name='mock-lemonbase', daemon=True).start()
+    return server
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Serve synthetic Lemonbase pages locally')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every page response')
+    parser.add_argument('--client-redirects', action='store_true',
+                        help='redirect review and 1:1 session URLs with JavaScript instead of HTTP 302')
+    args = parser.parse_args()
+    server = MockLemonbaseServer(MockData(seed=args.seed), port=args.port, latency=args.latency,
+                                 client_redirects=args.client_redirects)
+    print(f'Serving mock Lemonbase on {server.base_url}')
+    print(json.dumps({'reviews': list(server.data.reviews), 'sessions': list(server.data.sessions)}, indent=2))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
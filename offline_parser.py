@@ -0,0 +1,291 @@
+"""
+Offline HTML snapshot mode for the Lemonbase crawlers.
+
+- While crawling with --snapshot-dir, each settled page (and each meeting view) is saved once as a
+  gzip-compressed page_source snapshot.
+- This module re-applies the crawlers' selectors to those snapshots with BeautifulSoup in a process pool,
+  regenerating one_on_one_sessions/session_<id>.json and shared_reviews/shared-review-<id>.txt
+  without logging in or opening any pages.
+
+Snapshot layout:
+    <snapshot_dir>/one_on_one/<session_id>/session.html.gz
+    <snapshot_dir>/one_on_one/<session_id>/meeting_<index>.html.gz
+    <snapshot_dir>/shared_reviews/<review_id>.html.gz
+
+Usage:
+    python offline_parser.py [--snapshot-dir snapshots] [--processes N] [--inline-avatars]
+"""
+
+import gzip
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from glob import glob
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup
+from bs4.element import NavigableString, PreformattedString
+from extraction import (
+    AVATAR_IMG_SELECTOR,
+    COMMENT_INPUT_SELECTOR,
+    CONVERSATION_BLOCK_SELECTOR,
+    MEETING_DATE_SELECTOR,
+    REVIEW_BLOCK_SELECTOR,
+    REVIEW_HEADLINE_SELECTOR,
+    format_shared_review,
+)
+from author_registry import compact_conversations, inline_conversations, registry_for
+from result_store import FileStore
+from change_detection import merge_meetings
+
+BASE_URL = 'https://lemonbase.com'
+
+# Elements whose boundaries start a new line in rendered text
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'dd', 'div', 'dl', 'dt', 'fieldset', 'figcaption',
+    'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li', 'main',
+    'nav', 'ol', 'p', 'pre', 'section', 'table', 'tbody', 'thead', 'tr', 'ul',
+}
+# Elements that never contribute rendered text
+SKIP_TAGS = {'head', 'noscript', 'script', 'style', 'template', 'textarea', 'title'}
+
+_LINE_BREAK = object()
+_WHITESPACE = re.compile(r'[ \t\n\r\f]+')
+
+
+def save_snapshot(html, path):
+    """
+    Save page HTML as a gzip-compressed snapshot at path.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        f.write(html)
+
+
+def load_snapshot(path):
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return f.read()
+
+
+def session_snapshot_dir(snapshot_dir, session_id):
+    return os.path.join(snapshot_dir, 'one_on_one', session_id)
+
+
+def meeting_snapshot_path(snapshot_dir, session_id, meeting_idx):
+    return os.path.join(session_snapshot_dir(snapshot_dir, session_id), f'meeting_{meeting_idx:03d}.html.gz')
+
+
+def review_snapshot_path(snapshot_dir, review_id):
+    return os.path.join(snapshot_dir, 'shared_reviews', f'{review_id}.html.gz')
+
+
+def visible_text(element):
+    """
+    Approximate the browser's rendered text (what WebDriver's element.text returns):
+    collapse whitespace, break lines at block elements and <br>, and skip non-rendered elements.
+    """
+    parts = []
+
+    def walk(node):
+        for child in node.children:
+            if isinstance(child, PreformattedString):
+                continue
+            if isinstance(child, NavigableString):
+                parts.append(_WHITESPACE.sub(' ', str(child)))
+            elif child.name == 'br':
+                parts.append('\n')
+            elif child.name in SKIP_TAGS:
+                continue
+            elif child.name in BLOCK_TAGS:
+                parts.append(_LINE_BREAK)
+                walk(child)
+                parts.append(_LINE_BREAK)
+            else:
+                walk(child)
+
+    walk(element)
+    text = ''
+    pending_break = False
+    for part in parts:
+        if part is _LINE_BREAK:
+            pending_break = True
+            continue
+        at_line_start = not text or text.endswith('\n')
+        if part == ' ' and (at_line_start or pending_break or text.endswith(' ')):
+            continue
+        if pending_break and not at_line_start:
+            text += '\n'
+        pending_break = False
+        text += part
+    lines = [line.strip(' ') for line in text.replace('\xa0', ' ').split('\n')]
+    return '\n'.join(lines)
+
+
+def parse_meeting_html(html, meeting_idx, base_url=BASE_URL):
+    """
+    Parse one meeting-view snapshot into {'meeting_date', 'conversations'}, applying the same
+    filtering as the live crawler (comment-input blocks and empty blocks are skipped).
+    Returns None if the page has no conversation blocks, which the live crawler also skips.
+    Relative avatar URLs are resolved against base_url; avatar alt text is kept as 'author_name'.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    conv_blocks = soup.select(CONVERSATION_BLOCK_SELECTOR)
+    if not conv_blocks:
+        return None
+    dates = soup.select(MEETING_DATE_SELECTOR)
+    meeting_date = visible_text(dates[meeting_idx]).strip() if meeting_idx < len(dates) else ''
+    conversations = []
+    for block_idx, conv_block in enumerate(conv_blocks):
+        for child_idx, child_div in enumerate(conv_block.find_all('div', recursive=False)):
+            if child_div.select_one(COMMENT_INPUT_SELECTOR):
+                continue
+            text = visible_text(child_div).strip()
+            avatar_img = child_div.select_one(AVATAR_IMG_SELECTOR)
+            author_name = ''
+            if avatar_img is None:
+                avatar_url = ''
+            else:
+                src = avatar_img.get('src')
+                avatar_url = urljoin(base_url, src) if src is not None else None
+                author_name = (avatar_img.get('alt') or '').strip()
+            if text:
+                conversation = {
+                    'block_index': block_idx,
+                    'child_index': child_idx,
+                    'text': text,
+                    'avatar_url': avatar_url
+                }
+                if author_name:
+                    conversation['author_name'] = author_name
+                conversations.append(conversation)
+    return {
+        'meeting_date': meeting_date,
+        'conversations': conversations
+    }
+
+
+def parse_shared_review_html(html):
+    """
+    Parse a shared-review snapshot into (headlines, blocks) raw text lists.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    headlines = [visible_text(elem) for elem in soup.select(REVIEW_HEADLINE_SELECTOR)]
+    blocks = [visible_text(elem) for elem in soup.select(REVIEW_BLOCK_SELECTOR)]
+    return headlines, blocks
+
+
+def _meeting_index(path):
+    return int(os.path.basename(path).split('_')[1].split('.')[0])
+
+
+def _load_json(path, default):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+def session_snapshot_dates(session_dir):
+    """Meeting dates listed in a session's session.html.gz snapshot, or None if there is none."""
+    path = os.path.join(session_dir, 'session.html.gz')
+    if not os.path.exists(path):
+        return None
+    soup = BeautifulSoup(load_snapshot(path), 'html.parser')
+    return [visible_text(elem).strip() for elem in soup.select(MEETING_DATE_SELECTOR)]
+
+
+def reextract_session(session_dir, output_dir, inline_avatars=False):
+    """
+    Rebuild session_<id>.json from a session's meeting snapshots. Returns (session_id, meeting count, authors);
+    the meeting count is None if the session has no meeting snapshots and was left alone.
+    A --refresh crawl only snapshots the meetings it re-extracted, so when the session snapshot lists
+    meetings and session_<id>.json exists, the re-extracted meetings are merged into it (by date)
+    instead of replacing it.
+    Conversations reference their authors by id (see author_registry.py) unless inline_avatars is set;
+    the authors seen are returned for the caller to merge into authors.json.
+    """
+    session_id = os.path.basename(session_dir.rstrip(os.sep))
+    meeting_paths = sorted(glob(os.path.join(session_dir, 'meeting_*.html.gz')), key=_meeting_index)
+    if not meeting_paths:
+        return session_id, None, {}
+    session_results = []
+    for path in meeting_paths:
+        meeting = parse_meeting_html(load_snapshot(path), _meeting_index(path))
+        if meeting is not None:
+            session_results.append(meeting)
+    out_path = os.path.join(output_dir, f'session_{session_id}.json')
+    dates = session_snapshot_dates(session_dir)
+    stored_meetings = _load_json(out_path, None)
+    if dates and stored_meetings is not None:
+        extracted = {meeting['meeting_date']: meeting for meeting in session_results}
+        session_results = merge_meetings(
+            dates, {idx: extracted[date] for idx, date in enumerate(dates) if date in extracted}, stored_meetings)
+    stored_authors = _load_json(os.path.join(output_dir, 'authors.json'), {}) if inline_avatars else None
+    authors = {}
+    for meeting in session_results:
+        if inline_avatars:
+            meeting['conversations'] = inline_conversations(meeting['conversations'], stored_authors)
+        else:
+            meeting['conversations'], meeting_authors = compact_conversations(meeting['conversations'])
+            for author, info in meeting_authors.items():
+                if author not in authors or (info['name'] and not authors[author]['name']):
+                    authors[author] = info
+    with open(out_path, 'w', encoding='utf-8') as out:
+        json.dump(session_results, out, ensure_ascii=False, indent=2)
+    return session_id, len(session_results), authors
+
+
+def reextract_review(snapshot_path, output_dir):
+    """
+    Rebuild shared-review-<id>.txt from a shared-review snapshot. Returns (review_id, block count).
+    """
+    review_id = os.path.basename(snapshot_path)[:-len('.html.gz')]
+    headlines, blocks = parse_shared_review_html(load_snapshot(snapshot_path))
+    if blocks:
+        with open(os.path.join(output_dir, f'shared-review-{review_id}.txt'), 'w', encoding='utf-8') as out:
+            out.write(format_shared_review(headlines, blocks))
+    return review_id, len(blocks)
+
+
+def reextract_all(snapshot_dir='snapshots', sessions_output_dir='one_on_one_sessions',
+                  reviews_output_dir='shared_reviews', processes=None, inline_avatars=False):
+    """
+    Re-extract every snapshot under snapshot_dir with a process pool and rewrite the output files.
+    The workers' authors are merged into one authors.json by this process.
+    """
+    os.makedirs(sessions_output_dir, exist_ok=True)
+    os.makedirs(reviews_output_dir, exist_ok=True)
+    session_dirs = sorted(glob(os.path.join(snapshot_dir, 'one_on_one', '*', '')))
+    review_paths = sorted(glob(os.path.join(snapshot_dir, 'shared_reviews', '*.html.gz')))
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        session_futures = [pool.submit(reextract_session, d, sessions_output_dir, inline_avatars) for d in session_dirs]
+        review_futures = [pool.submit(reextract_review, p, reviews_output_dir) for p in review_paths]
+        registry = registry_for(FileStore(sessions_output_dir))
+        session_count = 0
+        for future in session_futures:
+            session_id, meeting_count, authors = future.result()
+            if meeting_count is None:
+                print(f"Skipped session {session_id} (no meeting snapshots)")
+                continue
+            registry.merge(authors)
+            session_count += 1
+            print(f"Re-extracted {meeting_count} meetings for session {session_id}")
+        for future in review_futures:
+            review_id, block_count = future.result()
+            print(f"Re-extracted {block_count} review blocks for shared review {review_id}")
+    print(f"Re-extracted {session_count} 1:1 sessions and {len(review_paths)} shared reviews from {snapshot_dir}")
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Re-extract crawler outputs from saved HTML snapshots')
+    parser.add_argument('--snapshot-dir', default='snapshots', help='directory written by --snapshot-dir (default: snapshots)')
+    parser.add_argument('--sessions-output-dir', default='one_on_one_sessions')
+    parser.add_argument('--reviews-output-dir', default='shared_reviews')
+    parser.add_argument('--processes', type=int, default=None, help='parser processes (default: CPU count)')
+    parser.add_argument('--inline-avatars', action='store_true',
+                        help='keep the full avatar_url in every conversation instead of an author id')
+    args = parser.parse_args()
+    reextract_all(args.snapshot_dir, args.sessions_output_dir, args.reviews_output_dir, args.processes,
+                  args.inline_avatars)
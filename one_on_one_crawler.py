@@ -1,18 +1,48 @@
 import os
 import time
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from dotenv import load_dotenv
 import getpass
-import json
 import tempfile
+from lean_driver import block_resources, create_driver as create_browser
+from worker_pool import run_pipeline, run_worker_pool
+from driver_manager import DEFAULT_LIFECYCLE, is_session_dead
+from session_cache import BASE_URL, ensure_logged_in
+from wait_strategy import SettleWaiter
+from extraction import CONVERSATION_BLOCK_SELECTOR, MEETING_DATE_SELECTOR, extract_meeting_conversations
+from checkpoint import MeetingJournal
+from url_manifest import UrlManifest, append_urls
+from offline_parser import meeting_snapshot_path, save_snapshot, session_snapshot_dir
+from result_store import close_stores, open_store
+from run_metrics import metrics
+from change_detection import (fingerprint_index, latest_conversations, meetings_to_refresh, merge_meetings,
+                              session_summary)
+from author_registry import prepare_meetings
 
-ONE_ON_ONE_URL = 'https://lemonbase.com/app/one-on-one?one_on_one_home%5Bpagination%5D%5Bcurrent%5D=1&one_on_one_home%5Bpagination%5D%5BpageSize%5D=100&one_on_one_home%5Bsorter%5D%5BcolumnKey%5D=startAt'
-BASE_1_1_URL = 'https://lemonbase.com/app/one-on-one/'
+ONE_ON_ONE_LIST_URL = BASE_URL + '/app/one-on-one?one_on_one_home%5Bpagination%5D%5Bcurrent%5D={page}&one_on_one_home%5Bpagination%5D%5BpageSize%5D={page_size}&one_on_one_home%5Bsorter%5D%5BcolumnKey%5D=startAt'
+ONE_ON_ONE_PAGE_SIZE = 100
+BASE_1_1_URL = BASE_URL + '/app/one-on-one/'
+
+# Block images, fonts and analytics in every driver (see lean_driver.py)
+LEAN_BROWSER = True
+# Also block stylesheet files in lean drivers (opt-in: stylesheets can change which text is visible)
+BLOCK_STYLESHEETS = False
+# Number of tabs used to extract a session's meetings in parallel (1 = click through meetings in one tab)
+MEETING_TABS = 1
+# Browser recycling, crash recovery and retry settings for the worker drivers (see driver_manager.py)
+DRIVER_LIFECYCLE = dict(DEFAULT_LIFECYCLE)
+# SQLite result database (see result_store.py); None keeps one session_<id>.json per session in the output directory
+RESULT_DB = None
+# Re-check already crawled sessions and merge in new or changed meetings (see change_detection.py)
+REFRESH = False
+# Keep the full avatar_url in every conversation instead of an author id plus authors.json (see author_registry.py)
+INLINE_AVATARS = False
+
+# Event-driven replacement for the fixed redirect/click sleeps; records how long each wait took
+settle = SettleWaiter(redirect_timeout=10, click_timeout=5)
 
 # Credential logic (reuse from crawler.py)
 def prompt_for_credentials():
@@ -29,7 +59,7 @@ PASSWORD = os.getenv('LEMONBASE_PASSWORD')
 if not EMAIL or not PASSWORD:
     EMAIL, PASSWORD = prompt_for_credentials()
 
-LOGIN_URL = 'https://lemonbase.com/login'
+LOGIN_URL = BASE_URL + '/login'
 
 def login(driver):
     driver.get(LOGIN_URL)
@@ -48,26 +78,56 @@ def login(driver):
     )
     print('Login successful!')
 
-def crawl_one_on_one_urls(driver, output_file='1_1_urls.txt'):
-    driver.get(ONE_ON_ONE_URL)
-    # Wait for table rows to load
-    WebDriverWait(driver, 10).until(
-        EC.presence_of_element_located((By.CSS_SELECTOR, 'tr.ant-table-row'))
-    )
-    rows = driver.find_elements(By.CSS_SELECTOR, 'tr.ant-table-row[data-row-key]')
-    print(f'Found {len(rows)} rows with data-row-key')
-    urls = []
-    for row in rows:
-        data_key = row.get_attribute('data-row-key')
-        if data_key:
-            url = BASE_1_1_URL + data_key
-            urls.append(url)
-    with open(output_file, 'w', encoding='utf-8') as f:
-        for url in urls:
-            f.write(url + '\n')
-    print(f'Saved {len(urls)} 1:1 URLs to {output_file}')
-
-def process_one_on_one_urls(driver, input_file='1_1_urls.txt', output_dir='one_on_one_sessions'):
+def authenticate(driver):
+    with metrics.span('login'):
+        ensure_logged_in(driver, login)
+
+def create_driver():
+    return create_browser(lean=LEAN_BROWSER, block_stylesheets=BLOCK_STYLESHEETS)
+
+def crawl_one_on_one_urls(driver, output_file='1_1_urls.txt', manifest_file='1_1_urls_manifest.json', full=False, on_url=None):
+    """
+    Page through the 1:1 list (sorted by startAt) and append newly discovered session URLs to output_file.
+    Known session IDs and their first-seen times are kept in manifest_file; paging stops at the first
+    page with no new IDs unless full=True.
+    The URL file and manifest are updated after every page, and on_url(url) (if given) is called for
+    each new URL right away, so extraction can start before discovery finishes.
+    """
+    manifest = UrlManifest(manifest_file, output_file, session_id_from_url)
+    new_urls = []
+    previous_keys = None
+    page = 1
+    while True:
+        driver.get(ONE_ON_ONE_LIST_URL.format(page=page, page_size=ONE_ON_ONE_PAGE_SIZE))
+        # Wait for table rows (or the empty-table placeholder) to load
+        WebDriverWait(driver, 10).until(
+            lambda d: d.find_elements(By.CSS_SELECTOR, 'tr.ant-table-row, .ant-table-placeholder')
+        )
+        rows = driver.find_elements(By.CSS_SELECTOR, 'tr.ant-table-row[data-row-key]')
+        print(f'Page {page}: found {len(rows)} rows with data-row-key')
+        keys = [row.get_attribute('data-row-key') for row in rows]
+        if keys == previous_keys:
+            # The list ignored the page parameter; nothing more to discover
+            break
+        previous_keys = keys
+        page_urls = [BASE_1_1_URL + data_key for data_key in keys
+                     if data_key and manifest.add(data_key, BASE_1_1_URL + data_key)]
+        append_urls(page_urls, output_file)
+        manifest.save()
+        new_urls.extend(page_urls)
+        if on_url is not None:
+            for url in page_urls:
+                on_url(url)
+        if len(rows) < ONE_ON_ONE_PAGE_SIZE:
+            break
+        if not page_urls and not full:
+            print(f'Page {page} has only known sessions, stopping discovery')
+            break
+        page += 1
+    print(f'Added {len(new_urls)} new 1:1 URLs to {output_file} ({len(manifest)} known)')
+    return new_urls
+
+def process_one_on_one_urls(driver, input_file='1_1_urls.txt', output_dir='one_on_one_sessions', snapshot_dir=None):
     """
     For each URL in input_file:
       - Open the URL and wait for redirect
@@ -77,87 +137,344 @@ def process_one_on_one_urls(driver, input_file='1_1_urls.txt', output_dir='one_o
           - Extract all conversation blocks (div[data-rbd-draggable-context-id][data-rbd-draggable-id])
           - For each, extract all child divs except those containing a textarea with placeholder '코멘트 입력'
           - For each valid child div, extract text and avatar icon info
+            (all in a single execute_script round trip, see extraction.py)
       - Save results grouped by meeting date as a JSON file per 1:1 session in output_dir
+      - If snapshot_dir is set, also save the settled session page and each meeting view as
+        compressed HTML snapshots for offline re-extraction (see offline_parser.py)
     """
-    import re
     os.makedirs(output_dir, exist_ok=True)
-    with open(input_file, 'r', encoding='utf-8') as f:
-        urls = [line.strip() for line in f if line.strip()]
+    urls = read_urls(input_file)
     for url in urls:
-        # Compute output file path for this session
-        session_id = url.rstrip('/').split('/')[-1]
-        out_path = os.path.join(output_dir, f'session_{session_id}.json')
-        if os.path.exists(out_path):
-            print(f"Skipping {url} (already crawled: {out_path})")
-            continue
-        driver.get(url)
-        time.sleep(5)  # Wait for possible client-side redirect
-        final_url = driver.current_url
-        print(f"Processing 1:1 session: {final_url}")
-        # Find all meeting date elements
+        process_one_on_one_url(driver, url, output_dir, snapshot_dir)
+    print(settle.report())
+
+def process_one_on_one_urls_parallel(input_file='1_1_urls.txt', output_dir='one_on_one_sessions', workers=2, snapshot_dir=None):
+    """
+    Same as process_one_on_one_urls, but splits the URLs across a pool of headless Chrome drivers.
+    Sessions already in the result store are dropped before the work queue is filled (unless REFRESH is set).
+    Each driver is recycled, restarted on crashes and retried per DRIVER_LIFECYCLE.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    store = result_store(output_dir)
+    urls = [url for url in read_urls(input_file) if REFRESH or not store.has_session(session_id_from_url(url))]
+    print(f"{len(urls)} 1:1 sessions to {'refresh' if REFRESH else 'crawl'} with {workers} workers")
+    run_worker_pool(
+        urls,
+        create_driver,
+        authenticate,
+        lambda driver, url: process_one_on_one_url(driver, url, output_dir, snapshot_dir),
+        workers=workers,
+        lifecycle=DRIVER_LIFECYCLE,
+    )
+    print(settle.report())
+
+def process_one_on_one_urls_pipeline(input_file='1_1_urls.txt', output_dir='one_on_one_sessions', workers=1,
+                                     snapshot_dir=None, full_discovery=False, queue_size=100):
+    """
+    Streaming discover-and-process: uncrawled sessions already in input_file are queued first, then a
+    discovery driver pages through the 1:1 list and queues each new session as its page is parsed, while
+    `workers` extraction drivers consume the bounded queue right away. input_file is still appended as a side log.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    store = result_store(output_dir)
+
+    def produce(emit):
+        if os.path.exists(input_file):
+            for url in read_urls(input_file):
+                if REFRESH or not store.has_session(session_id_from_url(url)):
+                    emit(url)
+        driver = create_driver()
         try:
+            authenticate(driver)
+            crawl_one_on_one_urls(driver, output_file=input_file, full=full_discovery, on_url=emit)
+        finally:
+            driver.quit()
+
+    run_pipeline(
+        produce,
+        create_driver,
+        authenticate,
+        lambda driver, url: process_one_on_one_url(driver, url, output_dir, snapshot_dir),
+        workers=workers,
+        queue_size=queue_size,
+        lifecycle=DRIVER_LIFECYCLE,
+    )
+    print(settle.report())
+
+def read_urls(input_file):
+    with open(input_file, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+def session_id_from_url(url):
+    return url.rstrip('/').split('/')[-1]
+
+def session_output_path(url, output_dir):
+    session_id = session_id_from_url(url)
+    return os.path.join(output_dir, f'session_{session_id}.json')
+
+def result_store(output_dir):
+    """
+    Where sessions are saved: the RESULT_DB database if set, else session_<id>.json files in output_dir.
+    """
+    return open_store(output_dir, RESULT_DB)
+
+def process_one_on_one_url(driver, url, output_dir='one_on_one_sessions', snapshot_dir=None):
+    """
+    Crawl a single 1:1 session URL and save its meetings to the result store (session_<id>.json in output_dir by default).
+    If snapshot_dir is set, the session page and each meeting view are saved as HTML snapshots.
+    Each meeting is journaled as soon as it is extracted, so an interrupted session resumes
+    from the next meeting; the journal (kept in output_dir) is saved to the store once the session completes.
+    With REFRESH, an already crawled session is skipped if its summary (meeting list and the conversations on the
+    landing view, i.e. the latest meeting) is unchanged; otherwise
+    only its new meetings and the previously latest one are re-extracted and merged into the stored result.
+    Conversations reference their authors by id (the registry is saved once per store) unless INLINE_AVATARS is set.
+    Returns where the session was saved, or None if the session was skipped or failed.
+    """
+    store = result_store(output_dir)
+    session_id = session_id_from_url(url)
+    stored_meetings = store.load_session(session_id) if store.has_session(session_id) else None
+    if stored_meetings is not None and not REFRESH:
+        print(f"Skipping {url} (already crawled)")
+        metrics.count('skips')
+        return None
+    metrics.count('urls')
+    with metrics.span('get'):
+        driver.get(url)
+    with metrics.span('settle'):
+        final_url = settle.wait_for_redirect(driver, ('/schedules/',))  # Wait for possible client-side redirect
+    print(f"Processing 1:1 session: {final_url}")
+    # Find all meeting date elements
+    try:
+        with metrics.span('query'):
             WebDriverWait(driver, 10).until(
-                EC.presence_of_all_elements_located((By.CSS_SELECTOR, 'div.typography-body2-bold.text-secondary.css-avbo3m.essl35z0'))
+                EC.presence_of_all_elements_located((By.CSS_SELECTOR, MEETING_DATE_SELECTOR))
             )
-            meeting_elems = driver.find_elements(By.CSS_SELECTOR, 'div.typography-body2-bold.text-secondary.css-avbo3m.essl35z0')
-            print(f"  Found {len(meeting_elems)} meeting date elements")
-        except Exception as e:
-            print(f"  Error finding meeting date elements: {e}")
+            meeting_elems = driver.find_elements(By.CSS_SELECTOR, MEETING_DATE_SELECTOR)
+        print(f"  Found {len(meeting_elems)} meeting date elements")
+    except Exception as e:
+        if is_session_dead(e):
+            raise
+        print(f"  Error finding meeting date elements: {e}")
+        metrics.count('errors')
+        return None
+    dates = [elem.text.strip() for elem in meeting_elems]
+    fingerprints = fingerprint_index(output_dir)
+    only = None
+    summary = None
+    if stored_meetings is not None:
+        # The session URL lands on the latest meeting: its conversations are the cheap content signal
+        summary = session_summary(dates, landing_conversations(driver))
+        if fingerprints.is_unchanged(session_id, summary):
+            print(f"  Unchanged since last crawl ({summary['meeting_count']} meetings, latest {summary['latest_date']}), skipping")
+            metrics.count('skips')
+            return None
+        only = meetings_to_refresh(dates, stored_meetings)
+        print(f"  Changed since last crawl: re-extracting {len(only)} of {len(dates)} meetings")
+    if snapshot_dir:
+        # Only for sessions that are actually (re-)extracted, so skipped sessions keep their snapshot set
+        save_snapshot(driver.page_source, os.path.join(session_snapshot_dir(snapshot_dir, session_id), 'session.html.gz'))
+    journal = MeetingJournal.for_output(session_output_path(url, output_dir))
+    if len(journal):
+        print(f"  Resuming: {len(journal)} meetings already journaled")
+    schedule_urls = collect_schedule_urls(driver, meeting_elems) if MEETING_TABS > 1 else None
+    if schedule_urls:
+        extract_meetings_in_tabs(driver, meeting_elems, schedule_urls, journal, session_id, snapshot_dir, only=only)
+    else:
+        extract_meetings_by_click(driver, meeting_elems, journal, session_id, snapshot_dir, only=only)
+    # Save results for this session, then drop the journal
+    if stored_meetings is None:
+        session_results = journal.meetings()
+        # First crawl: the landing (latest) meeting was just extracted with the others
+        summary = session_summary(dates, latest_conversations(dates, session_results))
+    else:
+        extracted = {idx: entry['meeting'] for idx, entry in journal.entries.items()}
+        session_results = merge_meetings(dates, extracted, stored_meetings)
+    session_results = prepare_meetings(session_results, store, INLINE_AVATARS)
+    if stored_meetings is not None:
+        new, modified, unchanged = fingerprints.diff(session_id, session_results)
+        print(f"  {new} new, {modified} modified, {unchanged} unchanged meetings")
+    with metrics.span('write'):
+        saved_to = store.save_session(session_id, session_results)
+        fingerprints.record(session_id, summary, session_results)
+        # The journal is the only durable copy until the store's open batch is committed
+        store.flush()
+    journal.remove()
+    print(f"  Saved {len(session_results)} meetings to {saved_to}")
+    return saved_to
+
+def landing_conversations(driver, timeout=5):
+    """
+    Conversations shown on the session's landing view (an empty list if none appear within timeout).
+    """
+    try:
+        with metrics.span('query'):
+            WebDriverWait(driver, timeout).until(
+                EC.presence_of_all_elements_located((By.CSS_SELECTOR, CONVERSATION_BLOCK_SELECTOR))
+            )
+    except Exception as e:
+        if is_session_dead(e):
+            raise
+        return []
+    with metrics.span('extract'):
+        return extract_meeting_conversations(driver)
+
+def extract_meetings_by_click(driver, meeting_elems, journal, session_id, snapshot_dir=None, only=None):
+    """
+    Click each meeting date in turn and journal its conversations (one meeting at a time, one tab).
+    If only is given, meetings whose index is not in it are left alone.
+    """
+    for meeting_idx, meeting_elem in enumerate(meeting_elems):
+        if only is not None and meeting_idx not in only:
             continue
-        session_results = []
-        for meeting_idx, meeting_elem in enumerate(meeting_elems):
-            try:
-                meeting_date = meeting_elem.text.strip()
+        try:
+            meeting_date = meeting_elem.text.strip()
+            if journal.has(meeting_idx, meeting_date):
+                metrics.count('skips')
+                continue
+            # Click and wait for the conversation blocks to change
+            with metrics.span('click'):
                 # Scroll into view and click
                 driver.execute_script("arguments[0].scrollIntoView();", meeting_elem)
-                meeting_elem.click()
-                time.sleep(2)  # Wait for content to update
-                # Now extract conversation blocks for this meeting
-                try:
+                settle.click_and_wait(driver, meeting_elem, CONVERSATION_BLOCK_SELECTOR)
+            # Now extract conversation blocks for this meeting
+            try:
+                with metrics.span('query'):
                     WebDriverWait(driver, 10).until(
-                        EC.presence_of_all_elements_located((By.CSS_SELECTOR, 'div[data-rbd-draggable-context-id][data-rbd-draggable-id]'))
+                        EC.presence_of_all_elements_located((By.CSS_SELECTOR, CONVERSATION_BLOCK_SELECTOR))
                     )
-                    conv_blocks = driver.find_elements(By.CSS_SELECTOR, 'div[data-rbd-draggable-context-id][data-rbd-draggable-id]')
-                except Exception as e:
-                    print(f"    Error finding conversation blocks for meeting '{meeting_date}': {e}")
-                    continue
-                conversations = []
-                for block_idx, conv_block in enumerate(conv_blocks):
-                    child_divs = conv_block.find_elements(By.XPATH, './div')
-                    for child_idx, child_div in enumerate(child_divs):
-                        # Skip if this is a comment input block (contains textarea with placeholder '코멘트 입력')
-                        try:
-                            textarea = child_div.find_element(By.XPATH, ".//textarea[@placeholder='코멘트 입력']")
-                            if textarea:
-                                continue
-                        except Exception:
-                            pass
-                        text = child_div.text.strip()
-                        avatar_url = ''
-                        try:
-                            avatar_img = child_div.find_element(By.CSS_SELECTOR, 'span.ant-avatar img')
-                            avatar_url = avatar_img.get_attribute('src')
-                        except Exception:
-                            avatar_url = ''
-                        if text:
-                            conversations.append({
-                                'block_index': block_idx,
-                                'child_index': child_idx,
-                                'text': text,
-                                'avatar_url': avatar_url
-                            })
-                session_results.append({
+            except Exception as e:
+                print(f"    Error finding conversation blocks for meeting '{meeting_date}': {e}")
+                metrics.count('errors')
+                continue
+            # One execute_script round trip for the whole meeting
+            with metrics.span('extract'):
+                conversations = extract_meeting_conversations(driver)
+            with metrics.span('write'):
+                if snapshot_dir:
+                    save_snapshot(driver.page_source, meeting_snapshot_path(snapshot_dir, session_id, meeting_idx))
+                journal.append(meeting_idx, {
                     'meeting_date': meeting_date,
                     'conversations': conversations
                 })
-                print(f"    Extracted {len(conversations)} conversations for meeting '{meeting_date}'")
-            except Exception as e:
-                print(f"    Error processing meeting element {meeting_idx}: {e}")
-                continue
-        # Save results for this session
-        with open(out_path, 'w', encoding='utf-8') as out:
-            json.dump(session_results, out, ensure_ascii=False, indent=2)
-        print(f"  Saved {len(session_results)} meetings to {out_path}")
+            metrics.count('meetings')
+            metrics.count('conversations', len(conversations))
+            print(f"    Extracted {len(conversations)} conversations for meeting '{meeting_date}'")
+        except Exception as e:
+            # A dead browser must not save a partial session: let the driver manager restart and retry
+            if is_session_dead(e):
+                raise
+            print(f"    Error processing meeting element {meeting_idx}: {e}")
+            metrics.count('errors')
+            continue
+
+def collect_schedule_urls(driver, meeting_elems, timeout=5):
+    """
+    Return the /schedules/<id> URL of every meeting, in meeting order, or None if they cannot be
+    determined (in which case the caller falls back to clicking through meetings in one tab).
+    Uses schedule links in the page when there is one per meeting, otherwise clicks each date
+    and reads the URL the app navigates to.
+    """
+    links = driver.execute_script(
+        "var seen = [];"
+        "document.querySelectorAll('a[href*=\"/schedules/\"]').forEach(function (a) {"
+        "  if (seen.indexOf(a.href) < 0) { seen.push(a.href); }"
+        "});"
+        "return seen;"
+    )
+    if links and len(links) == len(meeting_elems):
+        return links
+    urls = []
+    for meeting_elem in meeting_elems:
+        previous_url = driver.current_url
+        try:
+            driver.execute_script("arguments[0].scrollIntoView();", meeting_elem)
+            meeting_elem.click()
+            WebDriverWait(driver, timeout).until(lambda d: d.current_url != previous_url)
+        except Exception:
+            # The already-selected meeting does not change the URL
+            pass
+        urls.append(driver.current_url)
+    if len(set(urls)) != len(meeting_elems) or not all('/schedules/' in u for u in urls):
+        print("  Could not determine a schedule URL per meeting; extracting meetings in a single tab")
+        return None
+    return urls
+
+_TAB_READY_JS = """
+if (document.readyState !== 'complete') { return -1; }
+return document.querySelectorAll(arguments[0]).length;
+"""
+
+def extract_meetings_in_tabs(driver, meeting_elems, schedule_urls, journal, session_id, snapshot_dir=None,
+                             tabs=None, timeout=15, poll=0.1, only=None):
+    """
+    Extract meetings in parallel across `tabs` tabs of the same logged-in browser: each tab is pointed at a
+    meeting's /schedules/<id> URL without blocking, and tabs are polled round-robin and extracted as soon as
+    their conversation blocks have settled. Results are journaled by meeting index, so session_<id>.json
+    keeps the original meeting order. If only is given, meetings whose index is not in it are left alone.
+    """
+    tabs = tabs or MEETING_TABS
+    meeting_dates = [elem.text.strip() for elem in meeting_elems]
+    pending = [(idx, schedule_urls[idx]) for idx in range(len(schedule_urls))
+               if not journal.has(idx, meeting_dates[idx]) and (only is None or idx in only)]
+    if not pending:
+        return
+    main_handle = driver.current_window_handle
+    handles = []
+    for _ in range(min(tabs, len(pending))):
+        driver.switch_to.new_window('tab')
+        if LEAN_BROWSER:
+            block_resources(driver, BLOCK_STYLESHEETS)
+        handles.append(driver.current_window_handle)
+    # handle -> (meeting index, schedule URL, started at, last block count)
+    active = {}
+    try:
+        while pending or active:
+            for handle in handles:
+                if handle not in active and pending:
+                    meeting_idx, schedule_url = pending.pop(0)
+                    driver.switch_to.window(handle)
+                    driver.execute_script('window.location.href = arguments[0];', schedule_url)
+                    active[handle] = (meeting_idx, schedule_url, time.monotonic(), None)
+            time.sleep(poll)
+            for handle in list(active):
+                meeting_idx, schedule_url, started, last_count = active[handle]
+                meeting_date = meeting_dates[meeting_idx]
+                driver.switch_to.window(handle)
+                schedule_id = schedule_url.rstrip('/').split('/')[-1]
+                count = driver.execute_script(_TAB_READY_JS, CONVERSATION_BLOCK_SELECTOR) if schedule_id in driver.current_url else -1
+                # Settled: loaded, has conversation blocks, and the block count held steady for one poll
+                if count > 0 and count == last_count:
+                    if metrics.enabled:
+                        # Load-to-settled time of this tab, the counterpart of a meeting click in one tab
+                        metrics.record('tab_load', time.monotonic() - started)
+                    with metrics.span('extract'):
+                        conversations = extract_meeting_conversations(driver)
+                    with metrics.span('write'):
+                        if snapshot_dir:
+                            save_snapshot(driver.page_source, meeting_snapshot_path(snapshot_dir, session_id, meeting_idx))
+                        journal.append(meeting_idx, {
+                            'meeting_date': meeting_date,
+                            'conversations': conversations
+                        })
+                    metrics.count('meetings')
+                    metrics.count('conversations', len(conversations))
+                    print(f"    Extracted {len(conversations)} conversations for meeting '{meeting_date}'")
+                    del active[handle]
+                elif time.monotonic() - started > timeout:
+                    print(f"    Error finding conversation blocks for meeting '{meeting_date}': timed out after {timeout}s")
+                    metrics.count('errors')
+                    del active[handle]
+                else:
+                    active[handle] = (meeting_idx, schedule_url, started, count)
+    finally:
+        for handle in handles:
+            try:
+                driver.switch_to.window(handle)
+                driver.close()
+            except Exception:
+                pass
+        driver.switch_to.window(main_handle)
 
 def test_process_one_on_one_url(driver, test_url):
     """
@@ -184,43 +501,82 @@ def test_process_one_on_one_url(driver, test_url):
     # Clean up temp file
     os.remove(tmp_path)
 
-def main():
-    chrome_options = Options()
-    chrome_options.add_argument('--headless')
-    chrome_options.add_argument('--no-sandbox')
-    chrome_options.add_argument('--disable-dev-shm-usage')
-    driver = webdriver.Chrome(options=chrome_options)
+def main(workers=1, snapshot_dir=None, pipeline=False, full_discovery=False, metrics_path=None):
+    if metrics_path:
+        metrics.enable('one_on_one')
     try:
-        login(driver)
-        # Instead of crawling URLs, process all 1:1 session URLs in 1_1_urls.txt
-        process_one_on_one_urls(driver)
+        if pipeline:
+            process_one_on_one_urls_pipeline(workers=workers, snapshot_dir=snapshot_dir, full_discovery=full_discovery)
+        else:
+            # Process all 1:1 session URLs in 1_1_urls.txt; even a single worker goes through the pool
+            # so its driver is recycled and restarted on crashes
+            process_one_on_one_urls_parallel(workers=max(1, workers), snapshot_dir=snapshot_dir)
     finally:
-        driver.quit()
+        # Commit the last batch of a SQLite result store
+        close_stores()
+        if metrics_path:
+            print(metrics.report())
+            print("Wrote run metrics to %s and %s" % metrics.write(metrics_path))
 
 if __name__ == '__main__':
-    import sys
-    if len(sys.argv) > 1 and sys.argv[1] == 'process-1-1':
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        driver = webdriver.Chrome(options=chrome_options)
+    import argparse
+    parser = argparse.ArgumentParser(description='Lemonbase 1:1 meeting crawler')
+    parser.add_argument('command', nargs='?', choices=['process-1-1', 'crawl-urls', 'test-single'],
+                        help='process-1-1 (default) crawls 1_1_urls.txt, crawl-urls discovers new session URLs, '
+                             'test-single crawls one test session')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='number of parallel headless Chrome drivers (default: 1)')
+    parser.add_argument('--snapshot-dir', default=None,
+                        help='also save each session page and meeting view as a compressed HTML snapshot for offline_parser.py')
+    parser.add_argument('--full-discovery', action='store_true',
+                        help='crawl-urls/--pipeline: walk every list page instead of stopping at the first page with no new sessions')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='process-1-1: discover new sessions and stream them to the extraction workers as they are found')
+    parser.add_argument('--no-lean', action='store_true',
+                        help='load every resource (images, fonts, analytics) instead of the lean browser profile')
+    parser.add_argument('--block-css', action='store_true',
+                        help='lean browser: also block stylesheet files (faster, but may change which text is visible)')
+    parser.add_argument('--tabs', type=int, default=1,
+                        help='extract each session\'s meetings across this many tabs of the same browser (default: 1)')
+    parser.add_argument('--recycle-every', type=int, default=DEFAULT_LIFECYCLE['recycle_every'],
+                        help='restart each browser after this many sessions, 0 to never recycle (default: %(default)s)')
+    parser.add_argument('--max-memory-mb', type=int, default=DEFAULT_LIFECYCLE['max_memory_mb'],
+                        help='restart a browser whose chromedriver/Chrome processes use more than this many MB of RSS, 0 to disable (default: %(default)s)')
+    parser.add_argument('--max-attempts', type=int, default=DEFAULT_LIFECYCLE['max_attempts'],
+                        help='attempts per session URL before giving up, restarting dead browsers in between (default: %(default)s)')
+    parser.add_argument('--db', default=None,
+                        help='save sessions to this SQLite database instead of one_on_one_sessions/*.json '
+                             '(python result_store.py export regenerates the files)')
+    parser.add_argument('--refresh', action='store_true',
+                        help='re-check already crawled sessions: skip unchanged ones and merge in new or changed meetings')
+    parser.add_argument('--metrics', default=None, metavar='PATH',
+                        help='time each crawl phase and write a JSON report to PATH plus a Prometheus textfile (.prom)')
+    parser.add_argument('--inline-avatars', action='store_true',
+                        help='keep the full avatar_url in every conversation instead of an author id plus authors.json')
+    args = parser.parse_args()
+    LEAN_BROWSER = not args.no_lean
+    BLOCK_STYLESHEETS = args.block_css
+    MEETING_TABS = args.tabs
+    DRIVER_LIFECYCLE.update(recycle_every=args.recycle_every, max_memory_mb=args.max_memory_mb,
+                            max_attempts=max(1, args.max_attempts))
+    if args.command == 'crawl-urls':
+        driver = create_driver()
         try:
-            login(driver)
-            process_one_on_one_urls(driver)
+            authenticate(driver)
+            crawl_one_on_one_urls(driver, full=args.full_discovery)
         finally:
             driver.quit()
-    elif len(sys.argv) > 1 and sys.argv[1] == 'test-single':
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        driver = webdriver.Chrome(options=chrome_options)
+    elif args.command == 'test-single':
+        driver = create_driver()
         try:
-            login(driver)
+            authenticate(driver)
             test_url = 'https://lemonbase.com/app/one-on-one/0149ff12-8cb3-41db-8b4d-96f02c986dc3/schedules/99ae864c-8976-46aa-b347-eff422f92e85'
             test_process_one_on_one_url(driver, test_url)
         finally:
             driver.quit()
     else:
-        main() 
\ No newline at end of file
+        RESULT_DB = args.db
+        REFRESH = args.refresh
+        INLINE_AVATARS = args.inline_avatars
+        main(workers=args.workers, snapshot_dir=args.snapshot_dir, pipeline=args.pipeline, full_discovery=args.full_discovery,
+             metrics_path=args.metrics)
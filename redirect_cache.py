@@ -0,0 +1,75 @@
+"""
+Persistent redirect resolution cache for review URLs.
+
+- Maps each review URL to the final URL it redirected to, its classification
+  (shared-review / write-review / other) and when it was resolved.
+- Entries expire after a per-classification TTL, so write-review pages are re-checked
+  now and then in case they have since been shared.
+- With force=True every lookup misses and URLs are re-resolved (the cache is still updated).
+- URLs that did not resolve to a shared-review or write-review page (still on the review URL, e.g. because
+  the redirect wait ran out) are not cached, so the next run loads them again.
+- Resolutions are appended to review_redirects.jsonl (see jsonl_log.py); an existing review_redirects.json
+  from older runs is imported on first use.
+"""
+
+import time
+
+from jsonl_log import JsonlLog
+
+DEFAULT_TTLS = {
+    'shared-review': 30 * 24 * 60 * 60,
+    'write-review': 3 * 24 * 60 * 60,
+    # Never served from the cache (and no longer recorded); kept so older cache files expire at once
+    'other': 0,
+}
+
+
+def classify(final_url):
+    """Classify a resolved review URL the way process_review_url() does."""
+    if 'write-review' in final_url:
+        return 'write-review'
+    if 'shared-review' in final_url:
+        return 'shared-review'
+    return 'other'
+
+
+class RedirectCache:
+    """
+    review URL -> {'final_url', 'classification', 'resolved_at'}, persisted as an append-only JSONL log.
+    Loaded lazily on first use and safe to share between worker threads.
+    """
+
+    def __init__(self, path='review_redirects.jsonl', ttls=None, force=False, legacy_path=None):
+        self.path = path
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.force = force
+        self._log = JsonlLog(path, legacy_path=legacy_path)
+
+    def lookup(self, url):
+        """
+        Return the cached entry for url if it is still fresh, else None (always None when force is set).
+        """
+        if self.force:
+            return None
+        entry = self._log.get(url)
+        if entry is None:
+            return None
+        ttl = self.ttls.get(entry['classification'])
+        if ttl is not None and time.time() - entry['resolved_at'] > ttl:
+            return None
+        return entry
+
+    def record(self, url, final_url):
+        """
+        Store the resolution of url and append it to the log. Returns the new entry, or None for an
+        unresolved URL, which is not cached.
+        """
+        entry = {
+            'final_url': final_url,
+            'classification': classify(final_url),
+            'resolved_at': time.time(),
+        }
+        if entry['classification'] == 'other':
+            return None
+        self._log.put(url, entry)
+        return entry
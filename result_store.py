@@ -0,0 +1,370 @@
+"""
+Pluggable output backends for the Lemonbase crawlers.
+
+- FileStore writes the original layout: one session_<id>.json per 1:1 session and one
+  shared-review-<id>.txt per shared review, in the crawler's output directory.
+- SqliteStore writes everything to one SQLite database (WAL, batched transactions) with tables for
+  sessions, meetings, conversations, reviews, review headlines and review blocks, indexed by
+  session id, meeting date and review id.
+- Both also hold the 1:1 author registry (author_registry.py): authors.json in the output directory,
+  or the authors table.
+- Both load the IDs they already hold once at startup, so resume checks are set lookups
+  instead of one os.path.exists() per URL.
+- export_files() regenerates the file layout from a database, so existing consumers keep working:
+    python result_store.py export results.db [--sessions-dir one_on_one_sessions] [--reviews-dir shared_reviews]
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from atomic_io import write_json_atomic
+from extraction import format_shared_review
+
+DEFAULT_DB_PATH = 'results.db'
+
+_SESSION_FILE = re.compile(r'^session_(.+)\.json$')
+_REVIEW_FILE = re.compile(r'^shared-review-(.+)\.txt$')
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+
+class FileStore:
+    """
+    session_<id>.json / shared-review-<id>.txt files in output_dir.
+    """
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        os.makedirs(output_dir, exist_ok=True)
+        self._session_ids = set()
+        self._review_ids = set()
+        for name in os.listdir(output_dir):
+            match = _SESSION_FILE.match(name)
+            if match:
+                self._session_ids.add(match.group(1))
+            match = _REVIEW_FILE.match(name)
+            if match:
+                self._review_ids.add(match.group(1))
+
+    def session_path(self, session_id):
+        return os.path.join(self.output_dir, f'session_{session_id}.json')
+
+    def review_path(self, review_id):
+        return os.path.join(self.output_dir, f'shared-review-{review_id}.txt')
+
+    def authors_path(self):
+        return os.path.join(self.output_dir, 'authors.json')
+
+    def has_session(self, session_id):
+        return session_id in self._session_ids
+
+    def has_review(self, review_id):
+        return review_id in self._review_ids
+
+    def load_authors(self):
+        """The saved author registry ({author_id: {'avatar_url', 'name'}})."""
+        try:
+            with open(self.authors_path(), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def save_authors(self, authors):
+        """Atomically write the author registry."""
+        path = self.authors_path()
+        write_json_atomic(authors, path)
+        return path
+
+    def save_session(self, session_id, meetings):
+        """Atomically write a session's meetings. Returns where they were saved."""
+        path = self.session_path(session_id)
+        write_json_atomic(meetings, path)
+        self._session_ids.add(session_id)
+        return path
+
+    def load_session(self, session_id):
+        """The saved meetings of a session, or None if it was never saved."""
+        try:
+            with open(self.session_path(session_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save_review(self, review_id, headlines, blocks):
+        """Write a shared review's headlines and blocks. Returns where they were saved."""
+        path = self.review_path(review_id)
+        with open(path, 'w', encoding='utf-8') as out:
+            out.write(format_shared_review(headlines, blocks))
+        self._review_ids.add(review_id)
+        return path
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    meeting_count INTEGER NOT NULL,
+    saved_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meetings (
+    session_id TEXT NOT NULL,
+    meeting_index INTEGER NOT NULL,
+    meeting_date TEXT NOT NULL,
+    PRIMARY KEY (session_id, meeting_index)
+);
+CREATE INDEX IF NOT EXISTS meetings_by_date ON meetings (meeting_date);
+CREATE TABLE IF NOT EXISTS conversations (
+    session_id TEXT NOT NULL,
+    meeting_index INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    block_index INTEGER NOT NULL,
+    child_index INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    avatar_url TEXT,
+    author_id TEXT,
+    PRIMARY KEY (session_id, meeting_index, position)
+);
+CREATE TABLE IF NOT EXISTS authors (
+    author_id TEXT PRIMARY KEY,
+    avatar_url TEXT NOT NULL,
+    name TEXT
+);
+CREATE TABLE IF NOT EXISTS reviews (
+    review_id TEXT PRIMARY KEY,
+    saved_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS review_headlines (
+    review_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (review_id, position)
+);
+CREATE TABLE IF NOT EXISTS review_blocks (
+    review_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (review_id, position)
+);
+"""
+
+
+class SqliteStore:
+    """
+    All sessions and reviews in one SQLite database, safe to share between worker threads.
+    Writes are grouped into transactions, committed every batch_size items or on the first write after
+    commit_interval seconds; a crash loses at most the open batch, which is simply crawled again on the next run.
+    Callers that delete their own durable copy after saving (the 1:1 meeting journal) call flush() first.
+    Conversations keep either avatar_url (inline form) or author_id ('' when there is no avatar, compact form).
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, batch_size=50, commit_interval=5.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.commit_interval = commit_interval
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+        # Databases created before the author registry lack the author_id column
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(conversations)')}
+        if 'author_id' not in columns:
+            self._conn.execute('ALTER TABLE conversations ADD COLUMN author_id TEXT')
+        self._session_ids = {row[0] for row in self._conn.execute('SELECT session_id FROM sessions')}
+        self._review_ids = {row[0] for row in self._conn.execute('SELECT review_id FROM reviews')}
+        self._pending = 0
+        self._batch_started = None
+
+    def has_session(self, session_id):
+        return session_id in self._session_ids
+
+    def has_review(self, review_id):
+        return review_id in self._review_ids
+
+    def session_ids(self):
+        return sorted(self._session_ids)
+
+    def review_ids(self):
+        return sorted(self._review_ids)
+
+    def load_authors(self):
+        """The saved author registry ({author_id: {'avatar_url', 'name'}})."""
+        with self._lock:
+            return {author: {'avatar_url': avatar_url, 'name': name}
+                    for author, avatar_url, name in self._conn.execute('SELECT author_id, avatar_url, name FROM authors')}
+
+    def save_authors(self, authors):
+        """Insert or update the authors of the registry."""
+        with self._lock:
+            self._begin()
+            self._conn.executemany('INSERT OR REPLACE INTO authors VALUES (?, ?, ?)',
+                                   [(author, info['avatar_url'], info.get('name')) for author, info in authors.items()])
+            self._written()
+        return f'{self.path} (authors)'
+
+    def _begin(self):
+        if self._pending == 0:
+            self._conn.execute('BEGIN')
+            self._batch_started = time.monotonic()
+
+    def _written(self):
+        self._pending += 1
+        if self._pending >= self.batch_size or time.monotonic() - self._batch_started >= self.commit_interval:
+            self._commit()
+
+    def _commit(self):
+        if self._pending:
+            self._conn.execute('COMMIT')
+            self._pending = 0
+
+    def save_session(self, session_id, meetings):
+        """Replace a session's meetings and conversations. Returns where they were saved."""
+        with self._lock:
+            self._begin()
+            self._conn.execute('DELETE FROM conversations WHERE session_id = ?', (session_id,))
+            self._conn.execute('DELETE FROM meetings WHERE session_id = ?', (session_id,))
+            self._conn.execute('INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)', (session_id, len(meetings), _now()))
+            self._conn.executemany(
+                'INSERT INTO meetings VALUES (?, ?, ?)',
+                [(session_id, idx, meeting['meeting_date']) for idx, meeting in enumerate(meetings)]
+            )
+            self._conn.executemany(
+                'INSERT INTO conversations VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [(session_id, idx, position, conv['block_index'], conv['child_index'], conv['text'], conv.get('avatar_url'),
+                  (conv['author_id'] or '') if 'author_id' in conv else None)
+                 for idx, meeting in enumerate(meetings)
+                 for position, conv in enumerate(meeting['conversations'])]
+            )
+            self._session_ids.add(session_id)
+            self._written()
+        return f'{self.path} (session {session_id})'
+
+    def load_session(self, session_id):
+        """The saved meetings of a session, or None if it was never saved."""
+        if session_id not in self._session_ids:
+            return None
+        with self._lock:
+            meetings = [
+                {'meeting_date': date, 'conversations': []}
+                for date, in self._conn.execute(
+                    'SELECT meeting_date FROM meetings WHERE session_id = ? ORDER BY meeting_index', (session_id,))
+            ]
+            rows = self._conn.execute(
+                'SELECT meeting_index, block_index, child_index, text, avatar_url, author_id FROM conversations '
+                'WHERE session_id = ? ORDER BY meeting_index, position', (session_id,)
+            )
+            for idx, block_index, child_index, text, avatar_url, author_id in rows:
+                conversation = {'block_index': block_index, 'child_index': child_index, 'text': text}
+                if author_id is None:
+                    conversation['avatar_url'] = avatar_url
+                else:
+                    conversation['author_id'] = author_id or None
+                meetings[idx]['conversations'].append(conversation)
+        return meetings
+
+    def save_review(self, review_id, headlines, blocks):
+        """Replace a shared review's headlines and blocks. Returns where they were saved."""
+        headlines = [text.strip() for text in headlines if text.strip()]
+        blocks = [text.strip() for text in blocks if text.strip()]
+        with self._lock:
+            self._begin()
+            self._conn.execute('DELETE FROM review_headlines WHERE review_id = ?', (review_id,))
+            self._conn.execute('DELETE FROM review_blocks WHERE review_id = ?', (review_id,))
+            self._conn.execute('INSERT OR REPLACE INTO reviews VALUES (?, ?)', (review_id, _now()))
+            self._conn.executemany('INSERT INTO review_headlines VALUES (?, ?, ?)',
+                                   [(review_id, position, text) for position, text in enumerate(headlines)])
+            self._conn.executemany('INSERT INTO review_blocks VALUES (?, ?, ?)',
+                                   [(review_id, position, text) for position, text in enumerate(blocks)])
+            self._review_ids.add(review_id)
+            self._written()
+        return f'{self.path} (review {review_id})'
+
+    def load_review(self, review_id):
+        """(headlines, blocks) of a saved shared review, or None."""
+        if review_id not in self._review_ids:
+            return None
+        with self._lock:
+            headlines = [text for text, in self._conn.execute(
+                'SELECT text FROM review_headlines WHERE review_id = ? ORDER BY position', (review_id,))]
+            blocks = [text for text, in self._conn.execute(
+                'SELECT text FROM review_blocks WHERE review_id = ? ORDER BY position', (review_id,))]
+        return headlines, blocks
+
+    def flush(self):
+        with self._lock:
+            self._commit()
+
+    def close(self):
+        with self._lock:
+            self._commit()
+            self._conn.close()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def open_store(output_dir, db_path=None):
+    """
+    The shared store for a crawler run: the SQLite database at db_path if given,
+    else the file layout in output_dir. Stores are opened once per process and reused.
+    """
+    key = ('sqlite', db_path) if db_path else ('files', output_dir)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = SqliteStore(db_path) if db_path else FileStore(output_dir)
+        return _stores[key]
+
+
+def close_stores():
+    """Commit and close every store opened with open_store()."""
+    with _stores_lock:
+        for store in _stores.values():
+            store.close()
+        _stores.clear()
+
+
+def export_files(db_path=DEFAULT_DB_PATH, sessions_dir='one_on_one_sessions', reviews_dir='shared_reviews'):
+    """
+    Regenerate session_<id>.json, authors.json and shared-review-<id>.txt files from a database.
+    Returns (sessions written, reviews written).
+    """
+    store = SqliteStore(db_path)
+    try:
+        session_files = FileStore(sessions_dir)
+        session_ids = store.session_ids()
+        for session_id in session_ids:
+            session_files.save_session(session_id, store.load_session(session_id))
+        authors = store.load_authors()
+        if authors:
+            session_files.save_authors(authors)
+        review_files = FileStore(reviews_dir)
+        review_ids = store.review_ids()
+        for review_id in review_ids:
+            review_files.save_review(review_id, *store.load_review(review_id))
+        return len(session_ids), len(review_ids)
+    finally:
+        store.close()
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Crawler result store utilities')
+    parser.add_argument('command', choices=['export'])
+    parser.add_argument('db', nargs='?', default=DEFAULT_DB_PATH, help=f'SQLite result database (default: {DEFAULT_DB_PATH})')
+    parser.add_argument('--sessions-dir', default='one_on_one_sessions')
+    parser.add_argument('--reviews-dir', default='shared_reviews')
+    args = parser.parse_args()
+    sessions, reviews = export_files(args.db, args.sessions_dir, args.reviews_dir)
+    print(f"Exported {sessions} sessions to {args.sessions_dir}/ and {reviews} reviews to {args.reviews_dir}/")
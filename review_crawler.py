@@ -9,10 +9,8 @@ Lemonbase Review Crawler
 """
 
 import os
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from dotenv import load_dotenv
@@ -21,6 +19,18 @@ import time
 import tempfile
 from glob import glob
 import getpass
+import re
+from lean_driver import create_driver as create_browser
+from worker_pool import run_pipeline, run_worker_pool
+from driver_manager import DEFAULT_LIFECYCLE, is_session_dead
+from session_cache import BASE_URL, ensure_logged_in
+from wait_strategy import SettleWaiter
+from extraction import REVIEW_BLOCK_SELECTOR, extract_shared_review, shared_review_id
+from offline_parser import review_snapshot_path, save_snapshot
+from url_manifest import UrlManifest, append_urls
+from redirect_cache import RedirectCache
+from result_store import close_stores, open_store
+from run_metrics import metrics
 
 # Load credentials from environment variables only
 def prompt_for_credentials():
@@ -37,9 +47,21 @@ PASSWORD = os.getenv('LEMONBASE_PASSWORD')
 if not EMAIL or not PASSWORD:
     EMAIL, PASSWORD = prompt_for_credentials()
 
-LOGIN_URL = 'https://lemonbase.com/login'
-REVIEWS_URL = 'https://lemonbase.com/app/reviews?page=1'
-BASE_URL = 'https://lemonbase.com'
+LOGIN_URL = BASE_URL + '/login'
+REVIEWS_URL = BASE_URL + '/app/reviews?page=1'
+
+# Block images, fonts and analytics in every driver (see lean_driver.py)
+LEAN_BROWSER = True
+# Also block stylesheet files in lean drivers (opt-in: stylesheets can change which text is visible)
+BLOCK_STYLESHEETS = False
+# Browser recycling, crash recovery and retry settings for the worker drivers (see driver_manager.py)
+DRIVER_LIFECYCLE = dict(DEFAULT_LIFECYCLE)
+# SQLite result database (see result_store.py); None keeps one shared-review-<id>.txt per review in the output directory
+RESULT_DB = None
+# Event-driven replacement for the fixed redirect sleep; records how long each wait took
+settle = SettleWaiter(redirect_timeout=10)
+# Remembers where each review URL redirected to, so reruns can skip it without a page load
+redirect_cache = RedirectCache('review_redirects.jsonl', legacy_path='review_redirects.json')
 
 def login(driver):
     """
@@ -62,10 +84,27 @@ def login(driver):
     )
     print('Login successful!')
 
-def crawl_review_urls(driver):
+def authenticate(driver):
+    """
+    Log in using the on-disk session cache, falling back to login() when it is missing or expired.
+    """
+    with metrics.span('login'):
+        ensure_logged_in(driver, login)
+
+def create_driver():
+    """
+    Launch a headless Chrome driver with the crawler's standard options
+    (lean by default: images, fonts and analytics are blocked, see lean_driver.py).
+    """
+    return create_browser(lean=LEAN_BROWSER, block_stylesheets=BLOCK_STYLESHEETS)
+
+def crawl_review_urls(driver, manifest=None, full=False, on_page=None):
     """
-    Crawl all paginated review list pages and extract review URLs.
-    Returns a list of absolute review URLs.
+    Crawl paginated review list pages and extract review URLs.
+    Without a manifest, walks every page and returns all absolute review URLs.
+    With a UrlManifest, records new review IDs in it, stops at the first page with no new IDs
+    (unless full=True) and returns only the new URLs.
+    If given, on_page(urls) is called with each page's (new) URLs as soon as the page is parsed.
     """
     driver.get(REVIEWS_URL)
     review_links = []
@@ -74,6 +113,7 @@ def crawl_review_urls(driver):
             EC.presence_of_element_located((By.CSS_SELECTOR, 'tr.ant-table-row'))
         )
         rows = driver.find_elements(By.CSS_SELECTOR, 'tr.ant-table-row')
+        page_links = []
         for row in rows:
             tds = row.find_elements(By.CSS_SELECTOR, 'td')
             if len(tds) > 1:
@@ -81,7 +121,15 @@ def crawl_review_urls(driver):
                 href = a_tag.get_attribute('href')
                 if href:
                     # Ensure absolute URL
-                    review_links.append(href if href.startswith('http') else urljoin(BASE_URL, href))
+                    url = href if href.startswith('http') else urljoin(BASE_URL, href)
+                    if manifest is None or manifest.add(review_id_from_url(url), url):
+                        page_links.append(url)
+        review_links.extend(page_links)
+        if on_page is not None:
+            on_page(page_links)
+        if manifest is not None and not page_links and not full:
+            print('  Page has only known reviews, stopping discovery')
+            break
         # Pagination: check for next page button
         try:
             next_btn = driver.find_element(By.CSS_SELECTOR, 'ul.ant-pagination li.ant-pagination-next')
@@ -96,7 +144,34 @@ def crawl_review_urls(driver):
             break
     return review_links
 
-def process_review_urls(driver, input_file='review_urls.txt', output_dir='shared_reviews'):
+def review_id_from_url(url):
+    """
+    Review ID from a review list URL (/app/reviews/<id>...), or the URL itself if it has none.
+    """
+    match = re.search(r'/reviews/([^/?#]+)', url)
+    return match.group(1) if match else url
+
+def discover_review_urls(driver, output_file='review_urls.txt', manifest_file='review_urls_manifest.json', full=False, on_url=None):
+    """
+    Incremental discovery: append only newly seen review URLs to output_file, tracking known
+    review IDs and their first-seen times in manifest_file. Returns the new URLs.
+    The URL file and manifest are updated after every list page, and on_url(url) (if given)
+    is called for each new URL right away, so extraction can start before discovery finishes.
+    """
+    manifest = UrlManifest(manifest_file, output_file, review_id_from_url)
+
+    def on_page(page_urls):
+        append_urls(page_urls, output_file)
+        manifest.save()
+        if on_url is not None:
+            for url in page_urls:
+                on_url(url)
+
+    new_urls = crawl_review_urls(driver, manifest, full, on_page)
+    print(f"Added {len(new_urls)} new review URLs to {output_file} ({len(manifest)} known)")
+    return new_urls
+
+def process_review_urls(driver, input_file='review_urls.txt', output_dir='shared_reviews', snapshot_dir=None):
     """
     For each URL in input_file, open the URL, wait for any redirect, and check the final URL:
     - If it contains 'shared-review', extract all <div class="css-1veelxu"> texts and save to a file in output_dir.
@@ -106,66 +181,152 @@ def process_review_urls(driver, input_file='review_urls.txt', output_dir='shared
     """
     os.makedirs(output_dir, exist_ok=True)
     found_shared_review = False
-    with open(input_file, 'r', encoding='utf-8') as f:
-        urls = [line.strip() for line in f if line.strip()]
-    for url in urls:
-        driver.get(url)
-        time.sleep(5)  # Wait for possible client-side redirect
-        final_url = driver.current_url
-        print(f"Visited: {final_url}")
-        if 'write-review' in final_url:
-            print("  Skipped (write-review)")
-            continue
-        if 'shared-review' in final_url:
+    for url in read_urls(input_file):
+        if process_review_url(driver, url, output_dir, snapshot_dir):
             found_shared_review = True
-            # Extract review ID for filename (second-to-last path segment)
-            review_id = final_url.rstrip('/').split('/')[-2] if final_url.rstrip('/').endswith('shared-review') else final_url.rstrip('/').split('/')[-1]
-            filename = f'shared-review-{review_id}.txt'
-            filepath = os.path.join(output_dir, filename)
-            try:
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, 'div.css-1veelxu'))
-                )
-                divs = driver.find_elements(By.CSS_SELECTOR, 'div.css-1veelxu')
-                print(f"  Found {len(divs)} div.css-1veelxu elements")
-                if divs:
-                    with open(filepath, 'w', encoding='utf-8') as out:
-                        # Extract headline from .css-tojoty .typography-headline6.grow FIRST
-                        headline_written = False
-                        try:
-                            headline_elems = driver.find_elements(By.CSS_SELECTOR, 'div.css-tojoty .typography-headline6.grow')
-                            if headline_elems:
-                                for headline_elem in headline_elems:
-                                    headline_text = headline_elem.text.strip()
-                                    if headline_text:
-                                        out.write('[Headline]\n' + headline_text + '\n---\n')
-                                        headline_written = True
-                                print(f'  Extracted {len(headline_elems)} headline(s) from css-tojoty')
-                            else:
-                                print('  No css-tojoty headline found on page')
-                        except Exception as e:
-                            print(f'  Error extracting css-tojoty headline: {e}')
-                        # Now write the review blocks
-                        for div in divs:
-                            text = div.text.strip()
-                            if text:
-                                out.write(text + '\n---\n')
-                    print(f'  Saved shared review text to {filepath}')
-                else:
-                    print(f'  No matching divs to save for {final_url}')
-            except Exception as e:
-                print(f'  Error processing {final_url}: {e}')
-        else:
-            print("  Not a shared-review page, skipping.")
     if not found_shared_review:
         print("No shared-review pages were found after redirects.")
+    print(settle.report())
+
+def process_review_urls_parallel(input_file='review_urls.txt', output_dir='shared_reviews', workers=2, snapshot_dir=None):
+    """
+    Same as process_review_urls, but splits the URLs across a pool of headless Chrome drivers.
+    Each driver is recycled, restarted on crashes and retried per DRIVER_LIFECYCLE.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    urls = read_urls(input_file)
+    print(f"{len(urls)} review URLs to process with {workers} workers")
+    results = run_worker_pool(
+        urls,
+        create_driver,
+        authenticate,
+        lambda driver, url: process_review_url(driver, url, output_dir, snapshot_dir),
+        workers=workers,
+        lifecycle=DRIVER_LIFECYCLE,
+    )
+    if not any(found for _, found in results):
+        print("No shared-review pages were found after redirects.")
+    print(settle.report())
+
+def process_review_urls_pipeline(input_file='review_urls.txt', output_dir='shared_reviews', workers=1,
+                                 snapshot_dir=None, full_discovery=False, queue_size=100):
+    """
+    Streaming discover-and-process: URLs already in input_file are queued first, then a discovery
+    driver walks the review list and queues each new URL as its page is parsed, while `workers`
+    extraction drivers consume the bounded queue right away. input_file is still appended as a side log.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    def produce(emit):
+        if os.path.exists(input_file):
+            for url in read_urls(input_file):
+                emit(url)
+        driver = create_driver()
+        try:
+            authenticate(driver)
+            discover_review_urls(driver, output_file=input_file, full=full_discovery, on_url=emit)
+        finally:
+            driver.quit()
+
+    results = run_pipeline(
+        produce,
+        create_driver,
+        authenticate,
+        lambda driver, url: process_review_url(driver, url, output_dir, snapshot_dir),
+        workers=workers,
+        queue_size=queue_size,
+        lifecycle=DRIVER_LIFECYCLE,
+    )
+    if not any(found for _, found in results):
+        print("No shared-review pages were found after redirects.")
+    print(settle.report())
+
+def read_urls(input_file):
+    with open(input_file, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+def process_review_url(driver, url, output_dir='shared_reviews', snapshot_dir=None):
+    """
+    Open a single review URL, follow any redirect and, for shared-review pages, save the review text.
+    If snapshot_dir is set, the settled shared-review page is also saved as a compressed HTML snapshot.
+    URLs whose resolution is cached (write-review, or shared-review already saved) are skipped without a page load.
+    Returns True if the final page was a shared-review page.
+    """
+    cached = cached_resolution(url, output_dir)
+    if cached is not None:
+        print(f"Cached: {url} -> {cached['final_url']} ({cached['classification']}), skipping")
+        metrics.count('skips')
+        return cached['classification'] == 'shared-review'
+    metrics.count('urls')
+    with metrics.span('get'):
+        driver.get(url)
+    with metrics.span('settle'):
+        final_url = settle.wait_for_redirect(driver, ('shared-review', 'write-review'))  # Wait for possible client-side redirect
+    redirect_cache.record(url, final_url)
+    print(f"Visited: {final_url}")
+    if 'write-review' in final_url:
+        print("  Skipped (write-review)")
+        metrics.count('skips')
+        return False
+    if 'shared-review' not in final_url:
+        print("  Not a shared-review page, skipping.")
+        metrics.count('skips')
+        return False
+    review_id = shared_review_id(final_url)
+    try:
+        with metrics.span('query'):
+            WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, REVIEW_BLOCK_SELECTOR))
+            )
+        if snapshot_dir:
+            save_snapshot(driver.page_source, review_snapshot_path(snapshot_dir, review_id))
+        # Headlines and review blocks in a single execute_script round trip
+        with metrics.span('extract'):
+            headline_texts, block_texts = extract_shared_review(driver)
+        print(f"  Found {len(block_texts)} div.css-1veelxu elements")
+        if block_texts:
+            if headline_texts:
+                print(f'  Extracted {len(headline_texts)} headline(s) from css-tojoty')
+            else:
+                print('  No css-tojoty headline found on page')
+            # Headlines FIRST, then the review blocks
+            with metrics.span('write'):
+                saved_to = result_store(output_dir).save_review(review_id, headline_texts, block_texts)
+            metrics.count('shared_reviews')
+            print(f'  Saved shared review text to {saved_to}')
+        else:
+            print(f'  No matching divs to save for {final_url}')
+    except Exception as e:
+        if is_session_dead(e):
+            raise
+        print(f'  Error processing {final_url}: {e}')
+        metrics.count('errors')
+    return True
+
+def result_store(output_dir):
+    """
+    Where reviews are saved: the RESULT_DB database if set, else shared-review-<id>.txt files in output_dir.
+    """
+    return open_store(output_dir, RESULT_DB)
+
+def cached_resolution(url, output_dir):
+    """
+    Return the fresh redirect cache entry for url if it needs no page load
+    (write-review, not a review page, or a shared review already in the result store), else None.
+    """
+    cached = redirect_cache.lookup(url)
+    if cached is None:
+        return None
+    if cached['classification'] == 'shared-review' and not result_store(output_dir).has_review(shared_review_id(cached['final_url'])):
+        return None
+    return cached
 
 def test_crawl_single_shared_review(driver, url):
     """
     Test utility: Log in and extract all <div class="css-1veelxu"> texts and <div class="css-tojoty"><div class="typography-headline6 grow">...</div></div> headlines from a single shared-review URL using process_review_urls logic.
     Prints the extracted text blocks to stdout for verification.
     """
-    login(driver)
+    authenticate(driver)
     # Write the test URL to a temporary file
     with tempfile.NamedTemporaryFile('w+', delete=False, encoding='utf-8') as tmp:
         tmp.write(url + '\n')
@@ -185,48 +346,88 @@ def test_crawl_single_shared_review(driver, url):
     # Clean up temp file
     os.remove(tmp_path)
 
-def main():
+def main(workers=1, snapshot_dir=None, full_discovery=False, pipeline=False, force_resolve=False, metrics_path=None):
     """
     Main workflow:
     - Launch headless Chrome
     - Log in to Lemonbase
-    - Crawl all review URLs and save to review_urls.txt
+    - Discover new review URLs (incrementally, see url_manifest.py) and append them to review_urls.txt
     - For each review, follow redirects and extract shared-review texts to files
+      (split across `workers` recycled, crash-restarted drivers, optionally saving HTML snapshots)
+    - With pipeline=True, discovery and extraction run concurrently (see process_review_urls_pipeline)
+    - Known write-review URLs and already-saved shared reviews are skipped unless force_resolve=True
+    - With metrics_path, per-phase timings and counters are written there (see run_metrics.py)
     """
-    chrome_options = Options()
-    chrome_options.add_argument('--headless')
-    chrome_options.add_argument('--no-sandbox')
-    chrome_options.add_argument('--disable-dev-shm-usage')
-    driver = webdriver.Chrome(options=chrome_options)
+    if metrics_path:
+        metrics.enable('review')
     try:
-        login(driver)
-        review_urls = crawl_review_urls(driver)
-        print(f"Found {len(review_urls)} reviews:")
-        for url in review_urls:
-            print(url)
-        # Save to file
-        with open('review_urls.txt', 'w', encoding='utf-8') as f:
+        redirect_cache.force = force_resolve
+        if pipeline:
+            process_review_urls_pipeline(workers=workers, snapshot_dir=snapshot_dir, full_discovery=full_discovery)
+            return
+        driver = create_driver()
+        try:
+            authenticate(driver)
+            review_urls = discover_review_urls(driver, full=full_discovery)
+            print(f"Found {len(review_urls)} new reviews:")
             for url in review_urls:
-                f.write(url + '\n')
-        print("Saved review URLs to review_urls.txt")
-        # Process shared-review URLs and save their texts
-        process_review_urls(driver)
-        print("Saved shared review texts to individual files in shared_reviews directory")
+                print(url)
+        finally:
+            driver.quit()
+        # Process shared-review URLs and save their texts; even a single worker goes through the pool
+        # so its driver is recycled and restarted on crashes
+        process_review_urls_parallel(workers=max(1, workers), snapshot_dir=snapshot_dir)
+        print(f"Saved shared review texts to {RESULT_DB or 'individual files in shared_reviews directory'}")
     finally:
-        driver.quit()
+        # Commit the last batch of a SQLite result store
+        close_stores()
+        if metrics_path:
+            print(metrics.report())
+            print("Wrote run metrics to %s and %s" % metrics.write(metrics_path))
 
 if __name__ == '__main__':
-    import sys
-    if len(sys.argv) > 1 and sys.argv[1] == 'test-single':
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        driver = webdriver.Chrome(options=chrome_options)
+    import argparse
+    parser = argparse.ArgumentParser(description='Lemonbase review crawler')
+    parser.add_argument('command', nargs='?', choices=['test-single'],
+                        help='test-single crawls one test shared review; default crawls all reviews')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='number of parallel headless Chrome drivers for review extraction (default: 1)')
+    parser.add_argument('--snapshot-dir', default=None,
+                        help='also save each shared-review page as a compressed HTML snapshot for offline_parser.py')
+    parser.add_argument('--full-discovery', action='store_true',
+                        help='walk every review list page instead of stopping at the first page with no new reviews')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='stream discovered URLs to the extraction workers instead of running the two phases in sequence')
+    parser.add_argument('--force-resolve', action='store_true',
+                        help='ignore the review redirect cache and re-resolve every review URL')
+    parser.add_argument('--no-lean', action='store_true',
+                        help='load every resource (images, fonts, analytics) instead of the lean browser profile')
+    parser.add_argument('--block-css', action='store_true',
+                        help='lean browser: also block stylesheet files (faster, but may change which text is visible)')
+    parser.add_argument('--db', default=None,
+                        help='save reviews to this SQLite database instead of shared_reviews/*.txt '
+                             '(python result_store.py export regenerates the files)')
+    parser.add_argument('--metrics', default=None, metavar='PATH',
+                        help='time each crawl phase and write a JSON report to PATH plus a Prometheus textfile (.prom)')
+    parser.add_argument('--recycle-every', type=int, default=DEFAULT_LIFECYCLE['recycle_every'],
+                        help='restart each browser after this many reviews, 0 to never recycle (default: %(default)s)')
+    parser.add_argument('--max-memory-mb', type=int, default=DEFAULT_LIFECYCLE['max_memory_mb'],
+                        help='restart a browser whose chromedriver/Chrome processes use more than this many MB of RSS, 0 to disable (default: %(default)s)')
+    parser.add_argument('--max-attempts', type=int, default=DEFAULT_LIFECYCLE['max_attempts'],
+                        help='attempts per review URL before giving up, restarting dead browsers in between (default: %(default)s)')
+    args = parser.parse_args()
+    LEAN_BROWSER = not args.no_lean
+    BLOCK_STYLESHEETS = args.block_css
+    DRIVER_LIFECYCLE.update(recycle_every=args.recycle_every, max_memory_mb=args.max_memory_mb,
+                            max_attempts=max(1, args.max_attempts))
+    if args.command == 'test-single':
+        driver = create_driver()
         try:
             test_url = 'https://lemonbase.com/app/reviews/e47b95e8-5ca5-453b-9db6-63e40bb65664/shared-review'
             test_crawl_single_shared_review(driver, test_url)
         finally:
             driver.quit()
     else:
-        main() 
\ No newline at end of file
+        RESULT_DB = args.db
+        main(workers=args.workers, snapshot_dir=args.snapshot_dir, full_discovery=args.full_discovery,
+             pipeline=args.pipeline, force_resolve=args.force_resolve, metrics_path=args.metrics)
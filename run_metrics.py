@@ -0,0 +1,165 @@
+"""
+Per-phase timing and run counters shared by the Lemonbase crawlers.
+
+- Spans time the phases of a crawl (login, driver.get, settle wait, meeting click, element query,
+  extraction, output write); counters track URLs, meetings, conversations, errors and skips.
+- At the end of a run, write() saves a JSON report with p50/p95/p99 per phase and overall pages
+  per minute, plus a Prometheus textfile (same name, .prom) for the node_exporter textfile collector.
+- Off by default: a disabled span is a shared no-op context manager and a disabled count() returns
+  immediately, so the instrumentation costs essentially nothing unless --metrics is given.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from atomic_io import write_text_atomic
+
+PERCENTILES = (50, 95, 99)
+
+_NULL_SPAN = nullcontext()
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class _Span:
+    __slots__ = ('metrics', 'phase', 'started')
+
+    def __init__(self, metrics, phase):
+        self.metrics = metrics
+        self.phase = phase
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.record(self.phase, time.perf_counter() - self.started)
+        return False
+
+
+class RunMetrics:
+    """
+    Thread-safe phase durations and counters for one crawler run.
+    """
+
+    def __init__(self, crawler='crawler'):
+        self.crawler = crawler
+        self.enabled = False
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.durations = {}
+        self.counters = {}
+        self.started = time.monotonic()
+
+    def enable(self, crawler=None):
+        """Start recording (and restart the run clock)."""
+        if crawler:
+            self.crawler = crawler
+        self.reset()
+        self.enabled = True
+
+    def span(self, phase):
+        """Context manager timing one occurrence of phase."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, phase)
+
+    def record(self, phase, seconds):
+        with self._lock:
+            self.durations.setdefault(phase, []).append(seconds)
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def summary(self):
+        """
+        {'crawler', 'elapsed_seconds', 'pages_per_minute', 'counters', 'phases': {phase: {count, total, mean, max, p50, p95, p99}}}
+        Pages are the URLs counted under 'urls'.
+        """
+        with self._lock:
+            durations = {phase: sorted(values) for phase, values in self.durations.items()}
+            counters = dict(self.counters)
+        elapsed = time.monotonic() - self.started
+        phases = {}
+        for phase, values in sorted(durations.items()):
+            total = sum(values)
+            stats = {'count': len(values), 'total': total, 'mean': total / len(values), 'max': values[-1]}
+            for pct in PERCENTILES:
+                stats[f'p{pct}'] = percentile(values, pct)
+            phases[phase] = stats
+        return {
+            'crawler': self.crawler,
+            'elapsed_seconds': elapsed,
+            'pages_per_minute': counters.get('urls', 0) / elapsed * 60 if elapsed > 0 else 0.0,
+            'counters': counters,
+            'phases': phases,
+        }
+
+    def report(self):
+        """
+        Human-readable summary: one line per phase plus the counters.
+        """
+        summary = self.summary()
+        lines = [f"{summary['crawler']}: {summary['pages_per_minute']:.1f} pages/min over {summary['elapsed_seconds']:.1f}s, "
+                 + ', '.join(f'{name}={value}' for name, value in sorted(summary['counters'].items()))]
+        for phase, stats in summary['phases'].items():
+            lines.append(f"  {phase}: {stats['count']}x, {stats['total']:.1f}s total, p50 {stats['p50']:.2f}s, "
+                         f"p95 {stats['p95']:.2f}s, p99 {stats['p99']:.2f}s, max {stats['max']:.2f}s")
+        return '\n'.join(lines)
+
+    def prometheus(self, summary=None):
+        """The summary in Prometheus text exposition format."""
+        summary = summary or self.summary()
+        label = f'crawler="{summary["crawler"]}"'
+        lines = [
+            '# HELP lemonbase_crawler_phase_seconds Duration of each crawl phase.',
+            '# TYPE lemonbase_crawler_phase_seconds summary',
+        ]
+        for phase, stats in summary['phases'].items():
+            for pct in PERCENTILES:
+                lines.append(f'lemonbase_crawler_phase_seconds{{{label},phase="{phase}",quantile="{pct / 100}"}} {stats[f"p{pct}"]:.6f}')
+            lines.append(f'lemonbase_crawler_phase_seconds_sum{{{label},phase="{phase}"}} {stats["total"]:.6f}')
+            lines.append(f'lemonbase_crawler_phase_seconds_count{{{label},phase="{phase}"}} {stats["count"]}')
+        lines += [
+            '# HELP lemonbase_crawler_events_total Crawl events (urls, meetings, conversations, errors, skips).',
+            '# TYPE lemonbase_crawler_events_total counter',
+        ]
+        for name, value in sorted(summary['counters'].items()):
+            lines.append(f'lemonbase_crawler_events_total{{{label},event="{name}"}} {value}')
+        lines += [
+            '# HELP lemonbase_crawler_pages_per_minute Pages processed per minute over the whole run.',
+            '# TYPE lemonbase_crawler_pages_per_minute gauge',
+            f'lemonbase_crawler_pages_per_minute{{{label}}} {summary["pages_per_minute"]:.3f}',
+            '# HELP lemonbase_crawler_run_seconds Wall time of the run.',
+            '# TYPE lemonbase_crawler_run_seconds gauge',
+            f'lemonbase_crawler_run_seconds{{{label}}} {summary["elapsed_seconds"]:.3f}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """
+        Write the JSON report to path and the Prometheus textfile next to it (.prom), each atomically.
+        Returns (json path, prom path).
+        """
+        summary = self.summary()
+        prom_path = os.path.splitext(path)[0] + '.prom'
+        write_text_atomic(json.dumps(summary, ensure_ascii=False, indent=2), path)
+        write_text_atomic(self.prometheus(summary), prom_path)
+        return path, prom_path
+
+
+# Process-wide instance used by the crawlers and their helpers
+metrics = RunMetrics()
@@ -0,0 +1,136 @@
+"""
+Persistent authenticated session cache shared by the Lemonbase crawlers.
+
+- After a successful login, the driver's cookies and localStorage are saved to an on-disk cache.
+- Later drivers (and later runs) inject the cache and verify it with a single page load.
+- login() is only called when the cache is missing, expired or rejected by the site,
+  and only one driver at a time may fall back to it, so a worker pool does not cause a login storm.
+"""
+
+import json
+import os
+import threading
+import time
+from selenium.webdriver.support.ui import WebDriverWait
+from atomic_io import write_json_atomic
+
+DEFAULT_CACHE_PATH = os.getenv('LEMONBASE_SESSION_CACHE', '.lemonbase_session.json')
+# Overridable so the crawlers can run against mock_lemonbase.py (see benchmark.py)
+BASE_URL = os.getenv('LEMONBASE_BASE_URL', 'https://lemonbase.com').rstrip('/')
+CHECK_URL = BASE_URL + '/app/reviews?page=1'
+MAX_AGE_SECONDS = 12 * 60 * 60
+
+_login_lock = threading.Lock()
+
+
+def load_session(cache_path=DEFAULT_CACHE_PATH, max_age=MAX_AGE_SECONDS):
+    """
+    Read the cached session, or return None if it is missing, unreadable, too old
+    or contains an expired cookie.
+    """
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            session = json.load(f)
+    except (OSError, ValueError):
+        return None
+    now = time.time()
+    if now - session.get('saved_at', 0) > max_age:
+        return None
+    for cookie in session.get('cookies', []):
+        if 'expiry' in cookie and cookie['expiry'] <= now:
+            return None
+    return session
+
+
+def save_session(driver, cache_path=DEFAULT_CACHE_PATH):
+    """
+    Save the driver's cookies and localStorage to cache_path (atomically, readable by the owner only).
+    """
+    session = {
+        'saved_at': time.time(),
+        'cookies': driver.get_cookies(),
+        'local_storage': driver.execute_script(
+            'var items = {};'
+            'for (var i = 0; i < localStorage.length; i++) {'
+            '  var key = localStorage.key(i); items[key] = localStorage.getItem(key);'
+            '}'
+            'return items;'
+        ) or {},
+    }
+    write_json_atomic(session, cache_path, indent=None, mode=0o600)
+
+
+def inject_session(driver, session, base_url=BASE_URL):
+    """
+    Load a lightweight page on the Lemonbase origin and inject cached cookies and localStorage.
+    """
+    driver.get(base_url + '/robots.txt')
+    driver.delete_all_cookies()
+    for cookie in session.get('cookies', []):
+        try:
+            driver.add_cookie(cookie)
+        except Exception as e:
+            print(f"  Could not restore cookie {cookie.get('name')}: {e}")
+    local_storage = session.get('local_storage') or {}
+    if local_storage:
+        driver.execute_script(
+            'var items = arguments[0];'
+            'Object.keys(items).forEach(function (key) { localStorage.setItem(key, items[key]); });',
+            local_storage,
+        )
+
+
+def is_authenticated(driver, check_url=CHECK_URL, timeout=10):
+    """
+    One cheap check: open check_url and wait until the app either renders a table
+    or redirects back to the login page.
+    """
+    driver.get(check_url)
+    try:
+        WebDriverWait(driver, timeout).until(
+            lambda d: '/login' in d.current_url
+            or d.execute_script("return document.querySelector('tr.ant-table-row, .ant-table-placeholder') !== null")
+        )
+    except Exception:
+        return False
+    return '/login' not in driver.current_url
+
+
+def restore_session(driver, cache_path=DEFAULT_CACHE_PATH, check_url=CHECK_URL, max_age=MAX_AGE_SECONDS):
+    """
+    Inject the cached session into driver and verify it. Returns True if the driver is logged in.
+    """
+    session = load_session(cache_path, max_age)
+    if session is None:
+        return False
+    inject_session(driver, session)
+    return is_authenticated(driver, check_url)
+
+
+def _cache_mtime(cache_path):
+    try:
+        return os.path.getmtime(cache_path)
+    except OSError:
+        return None
+
+
+def ensure_logged_in(driver, login, cache_path=DEFAULT_CACHE_PATH, check_url=CHECK_URL, max_age=MAX_AGE_SECONDS):
+    """
+    Authenticate driver from the session cache, falling back to login(driver) and
+    refreshing the cache when the cached session is missing or expired.
+    """
+    seen_mtime = _cache_mtime(cache_path)
+    if restore_session(driver, cache_path, check_url, max_age):
+        print('Restored session from cache')
+        return
+    with _login_lock:
+        # Another driver may have refreshed the cache while we were waiting for the lock
+        if _cache_mtime(cache_path) != seen_mtime and restore_session(driver, cache_path, check_url, max_age):
+            print('Restored session from cache')
+            return
+        login(driver)
+        try:
+            save_session(driver, cache_path)
+            print(f'Saved session cache to {cache_path}')
+        except Exception as e:
+            print(f'Could not save session cache: {e}')
@@ -0,0 +1,111 @@
+"""
+HttpBackend against the local mock server (mock_lemonbase.py); no Chrome needed.
+"""
+
+import json
+
+import pytest
+import requests
+
+from http_backend import HttpBackend
+from mock_lemonbase import MockData, start_mock_server
+from result_store import FileStore
+
+
+@pytest.fixture
+def data():
+    return MockData(seed=1, reviews=8, sessions=4, meetings_per_session=3, conversations_per_meeting=3)
+
+
+def logged_in_backend(server):
+    session = requests.Session()
+    session.post(server.base_url + '/login', data={'email': 'test@lemonbase.test', 'password': 'test'},
+                 allow_redirects=False)
+    return HttpBackend([{'name': cookie.name, 'value': cookie.value} for cookie in session.cookies])
+
+
+def session_urls(server, data):
+    return [f'{server.base_url}/app/one-on-one/{session_id}' for session_id in data.sessions]
+
+
+def review_urls(server, data):
+    return [f'{server.base_url}/app/reviews/{review_id}' for review_id in data.reviews]
+
+
+def test_sessions_match_ground_truth(data, tmp_path):
+    server = start_mock_server(data)
+    try:
+        http = logged_in_backend(server)
+        fallback_urls = http.process_one_on_one_urls(session_urls(server, data), store=FileStore(str(tmp_path)))
+        http.close()
+    finally:
+        server.shutdown()
+    assert fallback_urls == []
+    for session_id in data.sessions:
+        saved = json.loads((tmp_path / f'session_{session_id}.json').read_text(encoding='utf-8'))
+        assert saved == data.expected_session(session_id)
+    assert json.loads((tmp_path / 'authors.json').read_text(encoding='utf-8')) == data.expected_authors()
+
+
+def test_inline_avatars(data, tmp_path):
+    server = start_mock_server(data)
+    try:
+        http = logged_in_backend(server)
+        http.process_one_on_one_urls(session_urls(server, data), store=FileStore(str(tmp_path)), inline_avatars=True)
+        http.close()
+    finally:
+        server.shutdown()
+    for session_id in data.sessions:
+        saved = json.loads((tmp_path / f'session_{session_id}.json').read_text(encoding='utf-8'))
+        assert saved == data.expected_session(session_id, inline_avatars=True)
+    assert not (tmp_path / 'authors.json').exists()
+
+
+def test_reviews_match_ground_truth(data, tmp_path):
+    resolved = {}
+    server = start_mock_server(data)
+    try:
+        http = logged_in_backend(server)
+        fallback_urls = http.process_review_urls(review_urls(server, data), store=FileStore(str(tmp_path)),
+                                                 on_resolved=resolved.__setitem__)
+        http.close()
+    finally:
+        server.shutdown()
+    assert fallback_urls == []
+    assert len(resolved) == len(data.reviews)
+    for review_id in data.reviews:
+        expected = data.expected_review(review_id)
+        path = tmp_path / f'shared-review-{review_id}.txt'
+        if expected is None:
+            assert not path.exists()
+        else:
+            assert path.read_text(encoding='utf-8') == expected
+
+
+def test_client_rendered_site_falls_back_after_one_probe(data, tmp_path):
+    server = start_mock_server(data, client_redirects=True)
+    requested = []
+    try:
+        http = logged_in_backend(server)
+        get = http.get
+        http.get = lambda url: requested.append(url) or get(url)
+        urls = session_urls(server, data)
+        fallback_urls = http.process_one_on_one_urls(urls, store=FileStore(str(tmp_path)))
+        http.close()
+    finally:
+        server.shutdown()
+    assert fallback_urls == urls
+    assert requested == urls[:1]
+    assert not list(tmp_path.glob('session_*.json'))
+
+
+def test_logged_out_session_falls_back(data, tmp_path):
+    server = start_mock_server(data)
+    try:
+        http = HttpBackend([])
+        urls = session_urls(server, data)
+        fallback_urls = http.process_one_on_one_urls(urls, store=FileStore(str(tmp_path)))
+        http.close()
+    finally:
+        server.shutdown()
+    assert fallback_urls == urls
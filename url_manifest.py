@@ -0,0 +1,61 @@
+"""
+Manifest of discovered 1:1 session / review IDs for incremental URL discovery.
+
+- Maps each known ID to its URL and the time it was first seen.
+- The list crawlers page through the (newest-first) list and stop at the first page that contains
+  only known IDs, so a daily refresh costs a couple of page loads instead of a full walk.
+- Only new URLs are appended to the URL files (1_1_urls.txt / review_urls.txt).
+"""
+
+import json
+import os
+from datetime import datetime, timezone
+from atomic_io import write_json_atomic
+
+
+class UrlManifest:
+    """
+    Known IDs -> {'url', 'first_seen'}, persisted as JSON next to the URL file.
+    """
+
+    def __init__(self, path, url_file=None, id_from_url=None):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        elif url_file and id_from_url and os.path.exists(url_file):
+            # First run with a manifest: everything already in the URL file counts as known
+            with open(url_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    url = line.strip()
+                    if url:
+                        self.add(id_from_url(url), url)
+
+    def __contains__(self, item_id):
+        return item_id in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, item_id, url):
+        """Record item_id if it is new. Returns True if it was not known before."""
+        if item_id in self.entries:
+            return False
+        self.entries[item_id] = {
+            'url': url,
+            'first_seen': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        }
+        return True
+
+    def save(self):
+        write_json_atomic(self.entries, self.path)
+
+
+def append_urls(urls, url_file):
+    """Append urls (one per line) to url_file."""
+    if not urls:
+        return
+    with open(url_file, 'a', encoding='utf-8') as f:
+        for url in urls:
+            f.write(url + '\n')
@@ -0,0 +1,137 @@
+"""
+Event-driven page settle detection shared by the Lemonbase crawlers.
+
+Replaces fixed time.sleep() calls with waits that return as soon as the page has settled:
+- After driver.get(): the URL matches an expected pattern (e.g. shared-review/write-review); without
+  patterns, once it has stopped changing and the document has finished loading.
+- After a click: a MutationObserver reports that the watched content changed and then went quiet.
+  Clicking an item that is already displayed (its link points at the current URL, or it is marked
+  selected) changes nothing, so it returns at once without waiting for a change.
+Every wait has a ceiling and records how long it actually took.
+"""
+
+import time
+
+# Installs a MutationObserver on document.body that timestamps the latest DOM mutation.
+_INSTALL_OBSERVER_JS = """
+if (window.__lbObserver) { window.__lbObserver.disconnect(); }
+window.__lbLastMutation = 0;
+window.__lbObserver = new MutationObserver(function () { window.__lbLastMutation = performance.now(); });
+window.__lbObserver.observe(document.body, {childList: true, subtree: true, characterData: true});
+"""
+
+# Cheap signature of the watched content: ids and total text length of the matching elements.
+_SIGNATURE_JS = """
+var nodes = document.querySelectorAll(arguments[0]);
+var ids = [];
+var length = 0;
+for (var i = 0; i < nodes.length; i++) {
+  ids.push(nodes[i].getAttribute('data-rbd-draggable-id') || '');
+  length += (nodes[i].textContent || '').length;
+}
+return ids.join(',') + '|' + length;
+"""
+
+# True if the element (or an ancestor) links to the current URL or carries a selected/current state.
+_ALREADY_DISPLAYED_JS = """
+function normalize(url) { return url.split('#')[0].split('?')[0].replace(/\\/$/, ''); }
+var current = normalize(location.href);
+for (var node = arguments[0]; node && node !== document.body; node = node.parentElement) {
+  if (node.tagName === 'A' && node.href && normalize(node.href) === current) { return true; }
+  if (node.getAttribute('aria-selected') === 'true' || node.getAttribute('aria-current') === 'page') { return true; }
+}
+return false;
+"""
+
+_QUIET_FOR_JS = """
+if (!window.__lbLastMutation) { return -1; }
+return performance.now() - window.__lbLastMutation;
+"""
+
+
+class SettleWaiter:
+    """
+    Waits for navigation and click-driven content updates to settle, up to a configurable ceiling.
+    Each wait is recorded as (kind, seconds, settled) in self.timings.
+    """
+
+    def __init__(self, redirect_timeout=10, click_timeout=5, stable_for=1.0, quiet_for=0.2, poll=0.1):
+        self.redirect_timeout = redirect_timeout
+        self.click_timeout = click_timeout
+        self.stable_for = stable_for
+        self.quiet_for = quiet_for
+        self.poll = poll
+        self.timings = []
+
+    def _record(self, kind, started, settled):
+        elapsed = time.monotonic() - started
+        self.timings.append((kind, elapsed, settled))
+        return elapsed
+
+    def wait_for_redirect(self, driver, patterns=()):
+        """
+        Wait after driver.get() for any client-side redirect to finish and return the final URL.
+        With patterns, returns as soon as the URL contains one of them; a URL that never matches is
+        waited out until redirect_timeout (a slow redirect must not look like a final page) and recorded
+        as not settled. Without patterns, returns once the URL has been unchanged for stable_for seconds
+        with the document fully loaded.
+        """
+        started = time.monotonic()
+        deadline = started + self.redirect_timeout
+        last_url = driver.current_url
+        last_change = started
+        while True:
+            now = time.monotonic()
+            url = driver.current_url
+            if url != last_url:
+                last_url, last_change = url, now
+            if any(pattern in url for pattern in patterns):
+                self._record('redirect', started, True)
+                return url
+            if not patterns and now - last_change >= self.stable_for and \
+                    driver.execute_script('return document.readyState') == 'complete':
+                self._record('redirect', started, True)
+                return url
+            if now >= deadline:
+                self._record('redirect', started, False)
+                return url
+            time.sleep(self.poll)
+
+    def click_and_wait(self, driver, element, content_selector):
+        """
+        Click element and wait until the content matching content_selector has changed
+        and the DOM has been quiet for quiet_for seconds.
+        If element is already displayed, nothing is clicked and it returns at once.
+        Returns True if the content settled before the ceiling.
+        """
+        if driver.execute_script(_ALREADY_DISPLAYED_JS, element):
+            self._record('click', time.monotonic(), True)
+            return True
+        driver.execute_script(_INSTALL_OBSERVER_JS)
+        before = driver.execute_script(_SIGNATURE_JS, content_selector)
+        started = time.monotonic()
+        element.click()
+        deadline = started + self.click_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.poll)
+            if driver.execute_script(_SIGNATURE_JS, content_selector) == before:
+                continue
+            quiet = driver.execute_script(_QUIET_FOR_JS)
+            if quiet is not None and quiet >= self.quiet_for * 1000:
+                self._record('click', started, True)
+                return True
+        self._record('click', started, False)
+        return False
+
+    def report(self):
+        """
+        Summarize recorded waits per kind: count, total and max seconds, and how many hit the ceiling.
+        """
+        lines = []
+        for kind in sorted({kind for kind, _, _ in self.timings}):
+            waits = [(elapsed, settled) for k, elapsed, settled in self.timings if k == kind]
+            total = sum(elapsed for elapsed, _ in waits)
+            timed_out = sum(1 for _, settled in waits if not settled)
+            lines.append(f"{kind}: {len(waits)} waits, {total:.1f}s total, "
+                         f"{total / len(waits):.2f}s avg, {max(e for e, _ in waits):.2f}s max, {timed_out} hit ceiling")
+        return '\n'.join(lines)
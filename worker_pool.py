@@ -0,0 +1,153 @@
+"""
+Parallel browser worker pool shared by the Lemonbase crawlers.
+
+- Starts N worker threads, each owning its own (headless) Chrome driver through a DriverManager
+  (recycling, crash/hang recovery and bounded retries, see driver_manager.py).
+- Each worker logs in once, then pulls URLs from a shared work queue until it is empty.
+- The per-URL work is delegated to the crawler's own process function, so outputs are unchanged.
+- Each worker reports its throughput when it finishes.
+"""
+
+import queue
+import threading
+import time
+from driver_manager import DriverManager
+from run_metrics import metrics
+
+
+class WorkerStats:
+    """Per-worker counters used for the throughput report."""
+
+    def __init__(self, worker_id):
+        self.worker_id = worker_id
+        self.processed = 0
+        self.errors = 0
+        self.restarts = 0
+        self.retries = 0
+        self.started_at = time.monotonic()
+        self.finished_at = None
+
+    @property
+    def elapsed(self):
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return end - self.started_at
+
+    def report(self):
+        elapsed = self.elapsed
+        per_minute = (self.processed / elapsed * 60) if elapsed > 0 else 0.0
+        return (f"[worker {self.worker_id}] {self.processed} URLs, {self.errors} errors, "
+                f"{self.retries} retries, {self.restarts} browser restarts "
+                f"in {elapsed:.1f}s ({per_minute:.1f} URLs/min)")
+
+
+_STOP = object()
+
+
+def _put(work_queue, item, threads):
+    """Put item on a bounded queue, giving up if every worker thread has stopped."""
+    while True:
+        try:
+            work_queue.put(item, timeout=1)
+            return
+        except queue.Full:
+            if not any(thread.is_alive() for thread in threads):
+                raise RuntimeError('all pipeline workers have stopped')
+
+
+def _worker_loop(worker_id, work_queue, create_driver, login, process_url, results, stats, on_result, lifecycle):
+    manager = DriverManager.from_lifecycle(create_driver, login, lifecycle, name=f'worker {worker_id}')
+    try:
+        manager.start()
+        while True:
+            url = work_queue.get()
+            if url is _STOP:
+                break
+            try:
+                with metrics.span('url'):
+                    result = manager.run(url, process_url)
+                results.append((url, result))
+                stats.processed += 1
+                on_result()
+            except Exception as e:
+                stats.errors += 1
+                metrics.count('errors')
+                print(f"[worker {worker_id}] Error processing {url}: {e}")
+    except Exception as e:
+        print(f"[worker {worker_id}] Worker stopped: {e}")
+    finally:
+        stats.finished_at = time.monotonic()
+        stats.restarts = manager.restarts
+        stats.retries = manager.retries
+        manager.quit()
+
+
+def _run(work_queue, workers, create_driver, login, process_url, produce, lifecycle):
+    started = time.monotonic()
+    first_result = []
+    results = []
+    stats = [WorkerStats(i) for i in range(workers)]
+
+    def on_result():
+        if not first_result:
+            first_result.append(time.monotonic() - started)
+
+    threads = [
+        threading.Thread(
+            target=_worker_loop,
+            args=(i, work_queue, create_driver, login, process_url, results, stats[i], on_result, lifecycle),
+            name=f'crawler-worker-{i}',
+            daemon=True,
+        )
+        for i in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        produce(threads)
+    finally:
+        try:
+            for _ in threads:
+                _put(work_queue, _STOP, threads)
+        except RuntimeError:
+            pass
+        for thread in threads:
+            thread.join()
+    for worker_stats in stats:
+        print(worker_stats.report())
+    total = sum(s.processed for s in stats)
+    wall = time.monotonic() - started
+    first = f", first result after {first_result[0]:.1f}s" if first_result else ''
+    print(f"Pool processed {total} URLs with {workers} workers in {wall:.1f}s{first}")
+    return results
+
+
+def run_worker_pool(urls, create_driver, login, process_url, workers=2, lifecycle=None):
+    """
+    Process urls with a pool of browser workers sharing one work queue.
+    - create_driver() must return a fresh WebDriver; login(driver) authenticates it.
+    - process_url(driver, url) does the per-URL work; its return value is collected.
+    - lifecycle overrides driver_manager.DEFAULT_LIFECYCLE (recycling, memory limit, retries).
+    Returns a list of (url, result) tuples in completion order.
+    """
+    if not urls:
+        return []
+    work_queue = queue.Queue()
+    for url in urls:
+        work_queue.put(url)
+    workers = max(1, min(workers, len(urls)))
+    return _run(work_queue, workers, create_driver, login, process_url, lambda threads: None, lifecycle)
+
+
+def run_pipeline(produce, create_driver, login, process_url, workers=2, queue_size=100, lifecycle=None):
+    """
+    Streaming variant of run_worker_pool: produce(emit) runs in the calling thread and calls emit(url)
+    for each URL as soon as it is discovered, while the workers consume them from a bounded queue.
+    emit() blocks when the queue is full (backpressure) and raises RuntimeError if every worker has stopped.
+    Returns a list of (url, result) tuples in completion order.
+    """
+    work_queue = queue.Queue(maxsize=queue_size)
+
+    def run_producer(threads):
+        produce(lambda url: _put(work_queue, url, threads))
+
+    return _run(work_queue, max(1, workers), create_driver, login, process_url, run_producer, lifecycle)